@@ -9,24 +9,35 @@ import numpy as np
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.preprocessors.noise_reduction import NoiseReductionProcessor
+from src.utils.audio import int16_to_float32, float32_to_int16, calculate_rms
+
+try:
+    import soundfile as sf  # libsndfile 直接解碼到 numpy array
+except ImportError:
+    sf = None
 
 
 def read_wav_file(file_path):
-    """讀取 WAV 檔案"""
-    with wave.open(file_path, 'rb') as wav_file:
-        channels = wav_file.getnchannels()
-        sample_rate = wav_file.getframerate()
-        frames = wav_file.getnframes()
-        duration = frames / sample_rate
-        audio_bytes = wav_file.readframes(frames)
-        
-        print(f"📄 原始檔案: {os.path.basename(file_path)}")
-        print(f"   採樣率: {sample_rate} Hz")
-        print(f"   聲道數: {channels}")
-        print(f"   時長: {duration:.2f} 秒")
-        print(f"   樣本數: {frames}")
-        
-        return audio_bytes, sample_rate, channels, duration
+    """讀取 WAV 檔案為 int16 陣列，形狀為 (frames, channels)"""
+    if sf is not None:
+        audio_array, sample_rate = sf.read(file_path, dtype='int16', always_2d=True)
+    else:
+        with wave.open(file_path, 'rb') as wav_file:
+            channels = wav_file.getnchannels()
+            sample_rate = wav_file.getframerate()
+            audio_bytes = wav_file.readframes(wav_file.getnframes())
+        audio_array = np.frombuffer(audio_bytes, dtype=np.int16).reshape(-1, channels)
+    
+    frames, channels = audio_array.shape
+    duration = frames / sample_rate
+    
+    print(f"📄 原始檔案: {os.path.basename(file_path)}")
+    print(f"   採樣率: {sample_rate} Hz")
+    print(f"   聲道數: {channels}")
+    print(f"   時長: {duration:.2f} 秒")
+    print(f"   樣本數: {frames}")
+    
+    return audio_array, sample_rate, channels, duration
 
 
 def save_wav_file(audio_bytes, file_path, sample_rate, channels):
@@ -63,7 +74,7 @@ def main():
         return
     
     # 讀取原始檔案
-    audio_bytes, sample_rate, channels, duration = read_wav_file(input_file)
+    original_array, sample_rate, channels, duration = read_wav_file(input_file)
     
     # 創建降噪處理器 - 關鍵：不改變採樣率
     noise_config = {
@@ -77,33 +88,28 @@ def main():
     print(f"\n🔧 創建降噪處理器 (採樣率: {sample_rate} Hz)")
     processor = NoiseReductionProcessor(noise_config)
     
-    # 執行處理 - 傳遞正確的原始參數
+    # 執行處理 - 直接以 numpy array 處理，不經過 bytes 轉換
     print("\n🎵 執行降噪處理...")
     try:
-        processed_bytes = processor.process(
-            audio_bytes,
-            original_sample_rate=sample_rate,
-            original_channels=channels
-        )
+        processed, _ = processor.process_array(int16_to_float32(original_array), sample_rate)
+        processed_array = float32_to_int16(processed)
         
         print("✅ 處理完成")
         
         # 保存結果 - 使用原始格式
         output_file = "./examples/simple_test_denoised.wav"
-        save_wav_file(processed_bytes, output_file, sample_rate, channels)
+        save_wav_file(processed_array, output_file, sample_rate, channels)
         
         # 驗證處理結果
         print(f"\n📊 處理結果分析:")
-        original_array = np.frombuffer(audio_bytes, dtype=np.int16)
-        processed_array = np.frombuffer(processed_bytes, dtype=np.int16)
         
-        print(f"   原始樣本數: {len(original_array)}")
-        print(f"   處理後樣本數: {len(processed_array)}")
-        print(f"   樣本數是否一致: {'✅' if len(original_array) == len(processed_array) else '❌'}")
+        print(f"   原始樣本數: {original_array.size}")
+        print(f"   處理後樣本數: {processed_array.size}")
+        print(f"   樣本數是否一致: {'✅' if original_array.size == processed_array.size else '❌'}")
         
         # 計算處理效果
-        original_rms = np.sqrt(np.mean(original_array.astype(np.float32)**2))
-        processed_rms = np.sqrt(np.mean(processed_array.astype(np.float32)**2))
+        original_rms = calculate_rms(original_array)
+        processed_rms = calculate_rms(processed_array)
         
         print(f"   原始 RMS: {original_rms:.1f}")
         print(f"   處理後 RMS: {processed_rms:.1f}")
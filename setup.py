@@ -35,6 +35,18 @@ setup(
             "pytest-asyncio>=0.21.0",
             "black>=23.0.0",
             "isort>=5.12.0",
+            # 測試需涵蓋 numba 與 numexpr 的加速路徑
+            "numba>=0.58.0",
+            "numexpr>=2.8.4",
+        ],
+        "faster-whisper": [
+            "faster-whisper>=1.0.0",
+        ],
+        "jit": [
+            "numba>=0.58.0",
+        ],
+        "numexpr": [
+            "numexpr>=2.8.4",
         ],
     },
     entry_points={
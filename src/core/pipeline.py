@@ -1,28 +1,110 @@
 """音訊處理管線"""
 
-from typing import List, AsyncGenerator
-from ..preprocessors.base import AudioPreprocessor
+import numpy as np
+from typing import List, AsyncGenerator, Optional, Tuple
+from ..preprocessors.base import AudioPreprocessor, PIPELINE_DTYPE, map_in_executor
+from ..utils.audio import AudioBytes, bytes_to_numpy, numpy_to_bytes, int16_to_float32, float32_to_int16
 from ..utils.exceptions import PreprocessorError, AudioProcessingError
 
 
+class AudioStream:
+    """串流處理用的 float32 環形緩衝區
+    
+    每個串流預先配置一次緩衝區，管線把各片段、各處理階段的結果寫入其中的連續區段，
+    處理過程不再為每個片段配置新陣列。
+    """
+    
+    __slots__ = ('buffer', 'position')
+    
+    def __init__(self, capacity: int):
+        """初始化環形緩衝區
+        
+        Args:
+            capacity: 緩衝區容量（樣本數，多聲道時為 frames * channels）
+        """
+        self.buffer = np.zeros(capacity, dtype=PIPELINE_DTYPE)
+        self.position = 0
+    
+    def reserve(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """取得下一段可寫入的連續區段，尾端空間不足時從頭繞回
+        
+        區段的內容在緩衝區繞回覆寫之前有效。
+        
+        Args:
+            shape: 區段形狀，(samples,) 或 (frames, channels)
+            
+        Returns:
+            緩衝區的 view
+            
+        Raises:
+            AudioProcessingError: 容量不足以讓連續的兩個區段互不重疊
+        """
+        size = int(np.prod(shape))
+        if size * 3 > self.buffer.size:
+            raise AudioProcessingError(f"環形緩衝區容量 {self.buffer.size} 不足，至少需為片段大小 {size} 的 3 倍")
+        
+        if self.position + size > self.buffer.size:
+            self.position = 0
+        start = self.position
+        self.position += size
+        return self.buffer[start:start + size].reshape(shape)
+
+
 class AudioPipeline:
     """音訊處理管線 - 處理器鏈"""
     
+    __slots__ = ('processors', '_name', '_process_fns', '_stages')
+    
     def __init__(self, processors: List[AudioPreprocessor]):
         """初始化處理管線
         
+        處理器序列在建立後固定不變，描述字串、綁定的處理方法與
+        執行階段的分組都在此預先計算。
+        
         Args:
             processors: 前處理器列表（按執行順序）
         """
-        self.processors = processors
+        self.processors = tuple(processors)
+        self._name = (
+            "Pipeline: " + " -> ".join(p.name for p in self.processors)
+            if self.processors else "Empty Pipeline"
+        )
+        self._process_fns = tuple(p.process for p in self.processors)
+        self._stages = self._build_stages(self.processors)
+    
+    @staticmethod
+    def _build_stages(processors: tuple) -> tuple:
+        """將處理器分組為執行階段
+        
+        連續支援 numpy array 的處理器合併為一個陣列階段，階段內以 float32
+        陣列傳遞，只在階段入口解碼、出口編碼一次；其餘處理器各自為一個 bytes 階段。
+        
+        Args:
+            processors: 前處理器序列
+            
+        Returns:
+            (是否為陣列階段, 處理器序列或綁定的 process 方法) 的 tuple
+        """
+        stages = []
+        for processor in processors:
+            if processor.supports_array:
+                if stages and stages[-1][0]:
+                    stages[-1] = (True, stages[-1][1] + (processor,))
+                else:
+                    stages.append((True, (processor,)))
+            else:
+                stages.append((False, processor.process))
+        return tuple(stages)
     
     
-    def process(self, audio_bytes: bytes, **kwargs) -> bytes:
+    def process(self, audio_bytes: AudioBytes, *, original_sample_rate: Optional[int] = None,
+                original_channels: Optional[int] = None) -> bytes:
         """處理音訊資料
         
         Args:
             audio_bytes: 原始音訊資料
-            **kwargs: 音訊參數（如 original_sample_rate, original_channels）
+            original_sample_rate: 原始採樣率
+            original_channels: 原始聲道數
             
         Returns:
             處理後的音訊資料
@@ -31,12 +113,94 @@ class AudioPipeline:
             AudioProcessingError: 處理過程中發生錯誤
         """
         try:
+            sample_rate = original_sample_rate
+            channels = original_channels
             result = audio_bytes
-            for processor in self.processors:
-                result = processor.process(result, **kwargs)
+            
+            # 格式未知時無法解碼為陣列，逐一以 bytes 處理
+            # （以固定的關鍵字參數呼叫，避免每一站重新打包 **kwargs 字典）
+            if sample_rate is None or channels is None:
+                for process in self._process_fns:
+                    result = process(result, original_sample_rate=sample_rate, original_channels=channels)
+                return result
+            
+            # 陣列階段結束後以實際輸出格式更新採樣率與聲道數，供後續階段使用
+            for array_stage, stage in self._stages:
+                if array_stage:
+                    result, sample_rate, channels = self._process_array(result, sample_rate, channels, stage)
+                else:
+                    result = stage(result, original_sample_rate=sample_rate, original_channels=channels)
             return result
+        except AudioProcessingError:
+            raise
         except Exception as e:
-            raise AudioProcessingError(f"音訊處理管線執行失敗: {str(e)}")
+            raise AudioProcessingError(f"音訊處理管線執行失敗: {e}") from e
+    
+    def process_into(self, audio_bytes: AudioBytes, stream: AudioStream,
+                     sample_rate: int, channels: int) -> np.ndarray:
+        """在串流的環形緩衝區內處理一個片段
+        
+        片段解碼後依序經過各處理器的 process_into，每一階段的輸出都寫入
+        stream 的下一個區段。所有處理器都必須支援 numpy array，且對此輸入格式
+        不改變音訊形狀；不符合時在解碼與配置區段之前就拋出錯誤。
+        
+        Args:
+            audio_bytes: int16 PCM 音訊片段
+            stream: 該串流的環形緩衝區
+            sample_rate: 採樣率
+            channels: 聲道數
+            
+        Returns:
+            處理後的 float32 陣列（stream 緩衝區的 view，繞回覆寫前有效）
+            
+        Raises:
+            AudioProcessingError: 處理過程中發生錯誤
+        """
+        if len(self._stages) > 1 or (self._stages and not self._stages[0][0]):
+            raise AudioProcessingError("管線中有不支援 numpy array 的處理器，無法使用 process_into")
+        for processor in self.processors:
+            if not processor.preserves_shape_for(sample_rate, channels):
+                raise AudioProcessingError(
+                    f"{processor.name} 會改變 {sample_rate} Hz / {channels} 聲道音訊的形狀，無法使用 process_into"
+                )
+        
+        try:
+            audio_array, _, _ = bytes_to_numpy(audio_bytes, sample_rate, channels)
+            audio = int16_to_float32(audio_array, out=stream.reserve(audio_array.shape))
+            
+            for processor in self.processors:
+                audio = processor.process_into(audio, stream.reserve(audio.shape), sample_rate)
+            return audio
+        except AudioProcessingError:
+            raise
+        except Exception as e:
+            raise AudioProcessingError(f"音訊處理管線執行失敗: {e}") from e
+    
+    @staticmethod
+    def _process_array(audio_bytes: AudioBytes, sample_rate: int, channels: int,
+                       processors: tuple) -> Tuple[bytes, int, int]:
+        """以 float32 陣列串接一組處理器
+        
+        Args:
+            audio_bytes: 原始 int16 PCM 音訊資料
+            sample_rate: 原始採樣率
+            channels: 原始聲道數
+            processors: 支援 numpy array 的處理器序列
+            
+        Returns:
+            tuple: (處理後的音訊資料, 處理後的採樣率, 處理後的聲道數)
+        """
+        audio_array, _, _ = bytes_to_numpy(audio_bytes, sample_rate, channels)
+        audio = int16_to_float32(audio_array)
+        
+        for processor in processors:
+            audio, sample_rate = processor.process_array(audio, sample_rate)
+            # 維持 float32 契約，避免某個處理器升型為 float64 後拖慢後續所有階段
+            if audio.dtype != PIPELINE_DTYPE:
+                audio = audio.astype(PIPELINE_DTYPE)
+        
+        channels = audio.shape[1] if audio.ndim > 1 else 1
+        return numpy_to_bytes(float32_to_int16(audio)), sample_rate, channels
     
     async def process_streaming(self, 
                               audio_stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
@@ -50,17 +214,50 @@ class AudioPipeline:
         """
         try:
             current_stream = audio_stream
+            sync_run = []
             
-            # 依序通過每個處理器
+            # 依序通過每個處理器；連續的非串流處理器合併為單一同步呼叫鏈，
+            # 避免每個處理器都包一層 async generator
             for processor in self.processors:
-                current_stream = processor.process_streaming(current_stream)
+                if processor.supports_streaming:
+                    if sync_run:
+                        current_stream = self._apply_sync_run(current_stream, tuple(sync_run))
+                        sync_run = []
+                    current_stream = processor.process_streaming(current_stream)
+                else:
+                    sync_run.append(processor)
+            
+            if sync_run:
+                current_stream = self._apply_sync_run(current_stream, tuple(sync_run))
             
             # 輸出最終結果
             async for chunk in current_stream:
                 yield chunk
                 
+        except AudioProcessingError:
+            raise
         except Exception as e:
-            raise AudioProcessingError(f"串流音訊處理管線執行失敗: {str(e)}")
+            raise AudioProcessingError(f"串流音訊處理管線執行失敗: {e}") from e
+    
+    @staticmethod
+    async def _apply_sync_run(audio_stream: AsyncGenerator[bytes, None],
+                              processors: tuple) -> AsyncGenerator[bytes, None]:
+        """以同步呼叫鏈處理每個音訊片段（在執行緒池中執行，與讀取下一個片段重疊）
+        
+        Args:
+            audio_stream: 音訊串流
+            processors: 連續的非串流處理器
+            
+        Yields:
+            處理後的音訊片段
+        """
+        def apply(chunk: bytes) -> bytes:
+            for processor in processors:
+                chunk = processor.process(chunk)
+            return chunk
+        
+        async for chunk in map_in_executor(audio_stream, apply):
+            yield chunk
     
     def __len__(self) -> int:
         """返回管線中處理器的數量"""
@@ -68,16 +265,14 @@ class AudioPipeline:
     
     def __str__(self) -> str:
         """返回管線描述"""
-        if not self.processors:
-            return "Empty Pipeline"
-        
-        processor_names = [p.name for p in self.processors]
-        return f"Pipeline: {' -> '.join(processor_names)}"
+        return self._name
 
 
 class AudioPipelineManager:
     """音訊處理管線管理器"""
     
+    __slots__ = ('registered_processors',)
+    
     def __init__(self):
         """初始化管線管理器"""
         self.registered_processors = {}
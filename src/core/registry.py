@@ -1,6 +1,7 @@
 """組件註冊機制"""
 
-from typing import Dict, Type, Any
+import json
+from typing import Dict, Type, Any, Tuple, Hashable
 from ..engines.base import ASREngine
 from ..preprocessors.base import AudioPreprocessor
 from ..utils.exceptions import EngineNotFoundError, PreprocessorNotFoundError
@@ -9,10 +10,13 @@ from ..utils.exceptions import EngineNotFoundError, PreprocessorNotFoundError
 class ComponentRegistry:
     """組件註冊表 - 管理 ASR 引擎和前處理器的註冊"""
     
+    __slots__ = ('engine_classes', 'preprocessor_classes', '_engine_instances')
+    
     def __init__(self):
         """初始化註冊表"""
         self.engine_classes: Dict[str, Type[ASREngine]] = {}
         self.preprocessor_classes: Dict[str, Type[AudioPreprocessor]] = {}
+        self._engine_instances: Dict[Tuple[str, frozenset], ASREngine] = {}
     
     def register_engine(self, name: str, engine_class: Type[ASREngine]):
         """註冊 ASR 引擎類
@@ -22,6 +26,10 @@ class ComponentRegistry:
             engine_class: 引擎類
         """
         self.engine_classes[name] = engine_class
+        # 重新註冊時捨棄舊類別建立的快取實例
+        self._engine_instances = {
+            key: engine for key, engine in self._engine_instances.items() if key[0] != name
+        }
     
     def register_preprocessor(self, name: str, preprocessor_class: Type[AudioPreprocessor]):
         """註冊前處理器類
@@ -32,12 +40,15 @@ class ComponentRegistry:
         """
         self.preprocessor_classes[name] = preprocessor_class
     
-    def create_engine(self, name: str, config: Dict[str, Any]) -> ASREngine:
+    def create_engine(self, name: str, config: Dict[str, Any], cached: bool = True) -> ASREngine:
         """創建 ASR 引擎實例
         
+        相同名稱與配置內容的引擎預設只建立一次，之後直接返回同一實例。
+        
         Args:
             name: 引擎名稱
             config: 引擎配置
+            cached: 是否重用相同配置的既有實例，False 時一律建立新實例
             
         Returns:
             ASR 引擎實例
@@ -49,7 +60,14 @@ class ComponentRegistry:
             raise EngineNotFoundError(f"找不到 ASR 引擎: {name}")
         
         engine_class = self.engine_classes[name]
-        return engine_class(config)
+        if not cached:
+            return engine_class(config)
+        
+        key = (name, frozenset((k, _hashable(v)) for k, v in config.items()))
+        engine = self._engine_instances.get(key)
+        if engine is None:
+            engine = self._engine_instances[key] = engine_class(config)
+        return engine
     
     def create_preprocessor(self, name: str, config: Dict[str, Any]) -> AudioPreprocessor:
         """創建前處理器實例
@@ -109,5 +127,21 @@ class ComponentRegistry:
         return name in self.preprocessor_classes
 
 
+def _hashable(value: Any) -> Hashable:
+    """將配置值轉為可雜湊的形式（巢狀 dict/list 以排序後的 JSON 表示）
+    
+    Args:
+        value: 配置值
+        
+    Returns:
+        可作為字典鍵值的物件
+    """
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True, default=str)
+
+
 # 全域註冊表實例
 registry = ComponentRegistry()
\ No newline at end of file
@@ -1,9 +1,17 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
 from typing import Dict, Any, AsyncGenerator
+from ..utils.audio import pcm_to_wav_bytes
 
 
 class ASREngine(ABC):
-    """ASR 引擎抽象基類"""
+    """ASR 引擎抽象基類
+    
+    宣告 __slots__ 以省去每個實例的 __dict__；子類需為新增的屬性宣告自己的 __slots__。
+    """
+    
+    __slots__ = ('config',)
     
     def __init__(self, config: Dict[str, Any]):
         """初始化 ASR 引擎
@@ -60,10 +68,18 @@ class ASREngine(ABC):
             轉譯結果文字片段
         """
         if not self.supports_streaming:
-            # 後備方案：收集全部音訊後一次轉譯
-            audio_buffer = b""
+            # 設定 stream_window_seconds 時分段轉譯，否則收集全部音訊後一次轉譯
+            window_seconds = self.config.get('stream_window_seconds')
+            if window_seconds:
+                async for result in self._transcribe_windows(audio_stream, window_seconds, **kwargs):
+                    yield result
+                return
+            
+            # 後備方案：收集全部音訊後一次轉譯（list + join 避免 bytes 重複串接的 O(n²) 複製）
+            chunks = []
             async for chunk in audio_stream:
-                audio_buffer += chunk
+                chunks.append(chunk)
+            audio_buffer = b"".join(chunks)
             
             if audio_buffer:
                 result = self.transcribe(audio_buffer, **kwargs)
@@ -71,4 +87,52 @@ class ASREngine(ABC):
             return
         
         # 如果引擎聲稱支援串流，必須覆寫此方法
-        raise NotImplementedError(f"{self.name} 必須實作 transcribe_streaming 方法")
\ No newline at end of file
+        raise NotImplementedError(f"{self.name} 必須實作 transcribe_streaming 方法")
+    
+    async def _transcribe_windows(self, 
+                                  audio_stream: AsyncGenerator[bytes, None],
+                                  window_seconds: float,
+                                  **kwargs) -> AsyncGenerator[str, None]:
+        """以固定長度視窗分段轉譯串流
+        
+        串流需為 int16 PCM 單聲道（採樣率由 stream_sample_rate 設定，預設 16000）。
+        每個視窗在執行緒池中轉譯，同時繼續接收下一個視窗的音訊；
+        同一時間最多只有一個視窗在轉譯，結果依序輸出。
+        
+        Args:
+            audio_stream: 音訊串流
+            window_seconds: 視窗長度（秒）
+            **kwargs: 其他參數
+            
+        Yields:
+            每個視窗的轉譯結果
+        """
+        sample_rate = int(self.config.get('stream_sample_rate', 16000))
+        window_bytes = max(1, int(window_seconds * sample_rate)) * 2
+        
+        loop = asyncio.get_running_loop()
+        transcribe = functools.partial(self.transcribe, **kwargs)
+        window = bytearray()
+        pending = None
+        
+        def submit(pcm: bytes):
+            return loop.run_in_executor(None, transcribe, pcm_to_wav_bytes(pcm, sample_rate))
+        
+        try:
+            async for chunk in audio_stream:
+                window.extend(chunk)
+                while len(window) >= window_bytes:
+                    if pending is not None:
+                        yield await pending
+                    pending = submit(bytes(window[:window_bytes]))
+                    del window[:window_bytes]
+            
+            if pending is not None:
+                yield await pending
+                pending = None
+            
+            if window:
+                yield await submit(bytes(window))
+        finally:
+            if pending is not None:
+                pending.cancel()
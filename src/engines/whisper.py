@@ -1,17 +1,42 @@
 """Whisper ASR 引擎實作"""
 
 import whisper
+import torch
+import asyncio
+import functools
 import io
 import tempfile
 import os
-from typing import Dict, Any, AsyncGenerator
+import threading
+import wave
+from typing import Dict, Any, AsyncGenerator, Optional, Tuple, List
+import numpy as np
 from .base import ASREngine
+from ..core.registry import _hashable
+from ..utils.audio import resample
 from ..utils.exceptions import EngineInitializationError, TranscriptionError
 
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # faster-whisper 為選用後端
+    WhisperModel = None
+
+# Whisper 模型要求的輸入採樣率
+WHISPER_SAMPLE_RATE = 16000
+
+# 已載入模型的全域快取，相同 (model_size, device) 的引擎共用同一模型
+_MODEL_CACHE: Dict[Tuple[str, ...], Any] = {}
+_MODEL_LOCK = threading.Lock()
+
 
 class WhisperEngine(ASREngine):
     """Whisper ASR 引擎"""
     
+    __slots__ = (
+        'model', 'model_size', 'device', 'language', 'backend', 'compute_type',
+        'batch_window_ms', 'max_batch_size', '_pending_batches', '_tmpdir', '_tmp_lock'
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         """初始化 Whisper 引擎
         
@@ -22,19 +47,73 @@ class WhisperEngine(ASREngine):
         self.model_size = config.get('model_size', 'base')
         self.device = config.get('device', 'auto')
         self.language = config.get('language', 'auto')
+        # 推論後端：openai（PyTorch）或 faster_whisper（CTranslate2）
+        self.backend = config.get('backend', 'openai')
+        # 計算精度：auto 時 openai 後端在 CUDA 使用 FP16、CPU 維持 FP32
+        # （torch 在 CPU 上缺乏快速 FP16 核心）；faster_whisper 後端則使用 int8 量化
+        self.compute_type = config.get('compute_type', 'auto')
+        # 非同步微批次：在時間窗內到達的 transcribe_async 請求合併為一次批次推論
+        self.batch_window_ms = float(config.get('batch_window_ms', 100))
+        self.max_batch_size = int(config.get('max_batch_size', 8))
+        self._pending_batches: Dict[tuple, list] = {}
+        # 需要 ffmpeg 解碼時使用的暫存目錄（首次使用時建立，引擎回收時自動清除）
+        self._tmpdir: Optional[tempfile.TemporaryDirectory] = None
+        self._tmp_lock = threading.Lock()
         super().__init__(config)
     
     def _initialize(self):
         """初始化 Whisper 模型"""
-        try:
-            # 載入 Whisper 模型
-            self.model = whisper.load_model(
-                name=self.model_size,
-                device=self.device if self.device != 'auto' else None
+        if self.backend not in ('openai', 'faster_whisper'):
+            raise EngineInitializationError(f"不支援的 Whisper 後端: {self.backend}")
+        
+        if self.backend == 'faster_whisper' and WhisperModel is None:
+            raise EngineInitializationError(
+                "faster_whisper 後端需要安裝 faster-whisper: pip install faster-whisper"
             )
+        
+        try:
+            if self.backend == 'faster_whisper':
+                compute_type = self._resolve_ct2_compute_type()
+                key = (self.backend, self.model_size, self.device, compute_type)
+            else:
+                key = (self.model_size, self.device)
+            
+            with _MODEL_LOCK:
+                model = _MODEL_CACHE.get(key)
+                if model is None:
+                    if self.backend == 'faster_whisper':
+                        model = WhisperModel(
+                            self.model_size,
+                            device=self.device,
+                            compute_type=compute_type
+                        )
+                    else:
+                        # 載入 Whisper 模型
+                        model = whisper.load_model(
+                            name=self.model_size,
+                            device=self.device if self.device != 'auto' else None
+                        )
+                    _MODEL_CACHE[key] = model
+            self.model = model
         except Exception as e:
             raise EngineInitializationError(f"Whisper 模型載入失敗: {str(e)}")
     
+    def _resolve_ct2_compute_type(self) -> str:
+        """決定 CTranslate2 的量化型別
+        
+        Returns:
+            compute_type 字串（CUDA 預設 int8_float16，CPU 預設 int8）
+        """
+        if self.compute_type != 'auto':
+            return self.compute_type
+        
+        device = self.device
+        if device == 'auto':
+            import ctranslate2
+            device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+        
+        return 'int8_float16' if device.startswith('cuda') else 'int8'
+    
     @property
     def name(self) -> str:
         """返回引擎名稱"""
@@ -57,36 +136,178 @@ class WhisperEngine(ASREngine):
             raise TranscriptionError("Whisper 模型未初始化")
         
         try:
-            # 創建臨時檔案來儲存音訊
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 設定轉譯選項
-                options = {
-                    'language': kwargs.get('language', self.language),
-                    'task': kwargs.get('task', 'transcribe'),
-                    'fp16': kwargs.get('fp16', False)
-                }
-                
-                # 如果語言設定為 auto，則不指定語言讓 Whisper 自動偵測
-                if options['language'] == 'auto':
-                    options.pop('language')
-                
-                # 進行轉譯
-                result = self.model.transcribe(temp_file_path, **options)
-                
+            if self.backend == 'faster_whisper':
+                return self._transcribe_faster_whisper(audio_bytes, **kwargs)
+            
+            # 設定轉譯選項
+            options = self._decode_options(kwargs)
+            
+            # PCM16 WAV 直接在記憶體中解碼，避免臨時檔案與 ffmpeg 子程序
+            audio = self._bytes_to_float32(audio_bytes)
+            if audio is not None:
+                result = self.model.transcribe(audio, **options)
                 return result['text'].strip()
-                
-            finally:
-                # 清理臨時檔案
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            
+            # 其他格式：寫入暫存檔交由 ffmpeg 解碼（只在解碼期間持有鎖，推理不受影響）
+            audio = self._load_audio_via_ffmpeg(audio_bytes)
+            result = self.model.transcribe(audio, **options)
+            
+            return result['text'].strip()
                     
         except Exception as e:
             raise TranscriptionError(f"Whisper 轉譯失敗: {str(e)}")
     
+    def transcribe_batch(self, audios: List[bytes], **kwargs) -> List[str]:
+        """批次轉譯多段音訊
+        
+        30 秒以內的音訊會補齊到相同長度後以單次解碼器呼叫完成，
+        超過 30 秒的音訊（或 faster_whisper 後端）則逐段轉譯。
+        
+        Args:
+            audios: 音訊資料列表
+            **kwargs: 其他參數（如 language, task, fp16）
+            
+        Returns:
+            與輸入順序對應的轉譯結果列表
+            
+        Raises:
+            TranscriptionError: 轉譯失敗
+        """
+        if not self.model:
+            raise TranscriptionError("Whisper 模型未初始化")
+        
+        if self.backend == 'faster_whisper':
+            return [self.transcribe(audio_bytes, **kwargs) for audio_bytes in audios]
+        
+        try:
+            results: List[Optional[str]] = [None] * len(audios)
+            batch_indices = []
+            batch_audio = []
+            
+            for i, audio_bytes in enumerate(audios):
+                audio = self._bytes_to_float32(audio_bytes)
+                if audio is None:
+                    audio = self._load_audio_via_ffmpeg(audio_bytes)
+                
+                if len(audio) > whisper.audio.N_SAMPLES:
+                    # 超過單一解碼視窗，改用完整的長音訊轉譯流程
+                    results[i] = self.model.transcribe(audio, **self._decode_options(kwargs))['text'].strip()
+                else:
+                    batch_indices.append(i)
+                    batch_audio.append(torch.from_numpy(whisper.pad_or_trim(audio)))
+            
+            if batch_audio:
+                audio_tensor = torch.stack(batch_audio).to(self.model.device, non_blocking=True)
+                # log_mel_spectrogram 以整個輸入的最大值截斷動態範圍，
+                # 必須逐段計算，否則安靜的音訊會受同批次較大聲的音訊影響而與 transcribe 結果不同
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(clip, n_mels=self.model.dims.n_mels)
+                    for clip in audio_tensor
+                ])
+                
+                options = self._decode_options(kwargs)
+                decoded = self.model.decode(mel, whisper.DecodingOptions(
+                    language=options.get('language'),
+                    task=options['task'],
+                    fp16=options['fp16']
+                ))
+                
+                for i, result in zip(batch_indices, decoded):
+                    results[i] = result.text.strip()
+            
+            return results
+            
+        except Exception as e:
+            raise TranscriptionError(f"Whisper 批次轉譯失敗: {str(e)}")
+    
+    async def transcribe_async(self, audio_bytes: bytes, **kwargs) -> str:
+        """非同步轉譯，並將短時間內的並行請求合併為一次批次推論
+        
+        第一個請求到達後等待 batch_window_ms，期間相同參數的請求會加入同一批次；
+        批次達到 max_batch_size 時立即送出。推論在執行緒池中進行。
+        
+        Args:
+            audio_bytes: 音訊資料
+            **kwargs: 其他參數（如 language）
+            
+        Returns:
+            轉譯結果文字
+        """
+        loop = asyncio.get_running_loop()
+        # 批次狀態依事件迴圈分開，不同執行緒或迴圈的請求不會混入同一批次；
+        # 參數值轉為可雜湊的形式，list 等選項也能作為鍵值
+        key = (loop, tuple(sorted((k, _hashable(v)) for k, v in kwargs.items())))
+        
+        batch = self._pending_batches.get(key)
+        if batch is None:
+            batch = self._pending_batches[key] = []
+            loop.call_later(self.batch_window_ms / 1000, self._flush_batch, key, batch, kwargs)
+        
+        future = loop.create_future()
+        batch.append((audio_bytes, future))
+        
+        if len(batch) >= self.max_batch_size:
+            self._flush_batch(key, batch, kwargs)
+        
+        return await future
+    
+    def _flush_batch(self, key: tuple, batch: list, options: Dict[str, Any]):
+        """送出累積的批次（同一批次只會送出一次）
+        
+        Args:
+            key: 批次鍵值（事件迴圈與參數）
+            batch: (音訊資料, future) 列表
+            options: 批次的轉譯參數
+        """
+        if self._pending_batches.get(key) is not batch:
+            return
+        del self._pending_batches[key]
+        
+        loop = key[0]
+        audios = [audio_bytes for audio_bytes, _ in batch]
+        task = loop.run_in_executor(None, functools.partial(self.transcribe_batch, audios, **options))
+        
+        def deliver(done):
+            for (_, future), result in zip(batch, self._batch_results(done, len(batch))):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        
+        task.add_done_callback(deliver)
+    
+    @staticmethod
+    def _batch_results(done: asyncio.Future, size: int) -> list:
+        """取出批次結果；批次失敗時每個請求都收到同一個例外"""
+        if done.cancelled():
+            return [asyncio.CancelledError()] * size
+        if done.exception() is not None:
+            return [done.exception()] * size
+        return done.result()
+    
+    def _decode_options(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """組合 openai 後端的轉譯選項
+        
+        Args:
+            kwargs: 呼叫端傳入的參數
+            
+        Returns:
+            轉譯選項字典（language 為 auto 時不包含 language）
+        """
+        options = {
+            'language': kwargs.get('language', self.language),
+            'task': kwargs.get('task', 'transcribe'),
+            'fp16': kwargs.get('fp16', self._default_fp16())
+        }
+        
+        # 如果語言設定為 auto，則不指定語言讓 Whisper 自動偵測
+        if options['language'] == 'auto':
+            options.pop('language')
+        
+        return options
+    
     @property
     def supports_streaming(self) -> bool:
         """Whisper 原生不支援串流，使用後備方案"""
@@ -124,36 +345,152 @@ class WhisperEngine(ASREngine):
             raise TranscriptionError("Whisper 模型未初始化")
         
         try:
-            # 創建臨時檔案
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 載入音訊並處理
-                audio = whisper.load_audio(temp_file_path)
-                audio = whisper.pad_or_trim(audio)
-                
-                # 產生 Mel 頻譜圖
-                mel = whisper.log_mel_spectrogram(
-                    audio, 
-                    n_mels=self.model.dims.n_mels
-                ).to(self.model.device)
-                
-                # 偵測語言
-                _, probs = self.model.detect_language(mel)
-                detected_language = max(probs, key=probs.get)
-                
-                return detected_language
-                
-            finally:
-                # 清理臨時檔案
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            if self.backend == 'faster_whisper':
+                # CTranslate2 在轉譯前即完成語言偵測，片段生成器不需要消耗
+                _, info = self.model.transcribe(self._faster_whisper_input(audio_bytes))
+                return info.language
+            
+            # 載入音訊並處理
+            audio = self._bytes_to_float32(audio_bytes)
+            if audio is None:
+                audio = self._load_audio_via_ffmpeg(audio_bytes)
+            audio = whisper.pad_or_trim(audio)
+            
+            # 先將波形移至模型所在設備，Mel 頻譜直接在該設備上計算（CUDA 時使用 cuFFT），
+            # 省去 CPU 計算後再搬移整張頻譜圖
+            audio_tensor = torch.from_numpy(audio).to(self.model.device, non_blocking=True)
+            
+            # 產生 Mel 頻譜圖
+            mel = whisper.log_mel_spectrogram(
+                audio_tensor, 
+                n_mels=self.model.dims.n_mels
+            )
+            
+            # 偵測語言
+            _, probs = self.model.detect_language(mel)
+            detected_language = max(probs, key=probs.get)
+            
+            return detected_language
                     
         except Exception as e:
             raise TranscriptionError(f"語言偵測失敗: {str(e)}")
     
+    def _transcribe_faster_whisper(self, audio_bytes: bytes, **kwargs) -> str:
+        """使用 faster-whisper（CTranslate2）後端轉譯
+        
+        Args:
+            audio_bytes: 音訊資料
+            **kwargs: 其他參數（如 language, task）
+            
+        Returns:
+            轉譯結果文字
+        """
+        language = kwargs.get('language', self.language)
+        
+        segments, _ = self.model.transcribe(
+            self._faster_whisper_input(audio_bytes),
+            language=None if language == 'auto' else language,
+            task=kwargs.get('task', 'transcribe')
+        )
+        
+        return ''.join(segment.text for segment in segments).strip()
+    
+    def _faster_whisper_input(self, audio_bytes: bytes):
+        """準備 faster-whisper 的輸入：PCM16 WAV 直接解碼，其他格式交由 PyAV 讀取
+        
+        Args:
+            audio_bytes: 音訊資料
+            
+        Returns:
+            float32 陣列或類檔案物件
+        """
+        audio = self._bytes_to_float32(audio_bytes)
+        return audio if audio is not None else io.BytesIO(audio_bytes)
+    
+    def _default_fp16(self) -> bool:
+        """依 compute_type 與模型所在設備決定是否預設使用 FP16
+        
+        Returns:
+            True 如果應使用 FP16 推論
+        """
+        if self.compute_type == 'float16':
+            return True
+        if self.compute_type == 'float32':
+            return False
+        
+        device = getattr(self.model, 'device', None)
+        return device is not None and str(device).startswith('cuda')
+    
+    def _bytes_to_float32(self, audio_bytes: bytes, 
+                          target_sr: int = WHISPER_SAMPLE_RATE) -> Optional[np.ndarray]:
+        """將 PCM16 WAV 在記憶體中解碼為 Whisper 所需的 float32 陣列
+        
+        Args:
+            audio_bytes: WAV 音訊資料
+            target_sr: 目標採樣率
+            
+        Returns:
+            單聲道 float32 陣列（範圍 -1.0 ~ 1.0）；非 PCM16 WAV 時返回 None
+        """
+        if audio_bytes[:4] != b'RIFF':
+            return None
+        
+        try:
+            with wave.open(io.BytesIO(audio_bytes), 'rb') as wav_file:
+                if wav_file.getsampwidth() != 2:
+                    return None
+                channels = wav_file.getnchannels()
+                sample_rate = wav_file.getframerate()
+                frames = wav_file.readframes(wav_file.getnframes())
+        except (wave.Error, EOFError):
+            return None
+        
+        audio = np.frombuffer(frames, dtype=np.int16)
+        
+        # 多聲道取平均轉為單聲道
+        if channels > 1:
+            audio = audio[:len(audio) - len(audio) % channels]
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        
+        audio = audio.astype(np.float32) / 32768.0
+        
+        if sample_rate != target_sr:
+            audio = resample(audio, sample_rate, target_sr)
+        
+        return audio
+    
+    def _load_audio_via_ffmpeg(self, audio_bytes: bytes) -> np.ndarray:
+        """透過臨時檔案與 ffmpeg 解碼非 WAV 格式的音訊
+        
+        Args:
+            audio_bytes: 音訊資料
+            
+        Returns:
+            16 kHz 單聲道 float32 陣列
+        """
+        with self._tmp_lock:
+            return whisper.load_audio(self._write_temp_audio(audio_bytes))
+    
+    def _write_temp_audio(self, audio_bytes: bytes) -> str:
+        """將音訊寫入引擎專用暫存目錄中的固定檔案（呼叫端需持有 _tmp_lock）
+        
+        重複使用同一個檔案覆寫內容，省去每次呼叫建立與刪除檔案的系統呼叫。
+        
+        Args:
+            audio_bytes: 音訊資料
+            
+        Returns:
+            暫存檔路徑
+        """
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix='whisper_')
+        
+        temp_file_path = os.path.join(self._tmpdir.name, 'buffer.wav')
+        with open(temp_file_path, 'wb') as temp_file:
+            temp_file.write(audio_bytes)
+        
+        return temp_file_path
+    
     def get_model_info(self) -> dict:
         """獲取模型資訊
         
@@ -163,6 +500,14 @@ class WhisperEngine(ASREngine):
         if not self.model:
             return {'status': 'not_initialized'}
         
+        if self.backend == 'faster_whisper':
+            return {
+                'model_size': self.model_size,
+                'device': self.device,
+                'backend': self.backend,
+                'compute_type': self._resolve_ct2_compute_type()
+            }
+        
         return {
             'model_size': self.model_size,
             'device': str(self.model.device),
@@ -1,9 +1,50 @@
+import asyncio
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncGenerator, Optional, Tuple, Callable, Hashable
+import numpy as np
+from ..utils.audio import AudioBytes, bytes_to_numpy, numpy_to_bytes, int16_to_float32, float32_to_int16
+from ..utils.exceptions import AudioProcessingError
+
+# 管線內部（process_array 之間）傳遞的樣本型別；int16 只在管線入口與出口轉換
+PIPELINE_DTYPE = np.float32
+
+
+class _Scratch(threading.local):
+    """每個執行緒各自的暫存陣列集合
+    
+    處理器實例會被多個執行緒共用（串流處理在執行緒池中執行），
+    因此暫存陣列依執行緒分開保存，依名稱取用，只在容量不足時重新配置。
+    """
+    
+    def __init__(self):
+        self.arrays: Dict[Hashable, np.ndarray] = {}
+    
+    def get(self, key: Hashable, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """取得指定形狀的暫存陣列
+        
+        Args:
+            key: 暫存區名稱
+            shape: 需要的形狀
+            dtype: 資料類型
+            
+        Returns:
+            暫存陣列（內容未初始化）
+        """
+        size = int(np.prod(shape))
+        buf = self.arrays.get(key)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = self.arrays[key] = np.empty(size, dtype=dtype)
+        return buf[:size].reshape(shape)
 
 
 class AudioPreprocessor(ABC):
-    """音訊前處理器抽象基類"""
+    """音訊前處理器抽象基類
+    
+    宣告 __slots__ 以省去每個實例的 __dict__；子類需為新增的屬性宣告自己的 __slots__。
+    """
+    
+    __slots__ = ('config', '_cache', '_scratch')
     
     def __init__(self, config: Dict[str, Any]):
         """初始化前處理器
@@ -12,6 +53,10 @@ class AudioPreprocessor(ABC):
             config: 前處理器配置字典
         """
         self.config = config
+        # 跨呼叫重複使用的常數陣列（窗函數、濾波器係數等）
+        self._cache: Dict[Hashable, np.ndarray] = {}
+        # 每個執行緒各自的暫存陣列（格式轉換、遮罩、處理結果等）
+        self._scratch = _Scratch()
         self._initialize()
     
     @abstractmethod
@@ -26,18 +71,161 @@ class AudioPreprocessor(ABC):
         pass
     
     @abstractmethod
-    def process(self, audio_bytes: bytes, **kwargs) -> bytes:
+    def process(self, audio_bytes: AudioBytes, *, original_sample_rate: Optional[int] = None,
+                original_channels: Optional[int] = None) -> bytes:
         """處理音訊資料
         
         Args:
-            audio_bytes: 原始音訊資料
-            **kwargs: 額外參數（如 original_sample_rate, original_channels）
+            audio_bytes: 原始音訊資料（bytes，或 memoryview 等 C 連續的 bytes-like 物件，可省去複製）
+            original_sample_rate: 原始採樣率（未提供時由處理器自行決定預設值）
+            original_channels: 原始聲道數（未提供時由處理器自行決定預設值）
             
         Returns:
             處理後的音訊資料
         """
         pass
     
+    def _cached(self, key: Hashable, factory: Callable[[], np.ndarray]) -> np.ndarray:
+        """取得快取的常數陣列，不存在時以 factory 建立
+        
+        Args:
+            key: 快取鍵值
+            factory: 建立陣列的函數
+            
+        Returns:
+            快取的陣列（呼叫端不應就地修改）
+        """
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = factory()
+        return value
+    
+    def _hann(self, n: int) -> np.ndarray:
+        """取得長度為 n 的週期性 Hann 窗（float32）
+        
+        Args:
+            n: 窗長度
+            
+        Returns:
+            Hann 窗陣列
+        """
+        return self._cached(
+            ('hann', n),
+            lambda: (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+        )
+    
+    def _buffer(self, key: Hashable, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """取得目前執行緒的暫存陣列，容量不足或型別不同時才重新配置
+        
+        Args:
+            key: 暫存區名稱
+            shape: 需要的形狀
+            dtype: 資料類型
+            
+        Returns:
+            指定形狀的暫存陣列（內容未初始化，下次呼叫時會被覆寫）
+        """
+        return self._scratch.get(key, shape, dtype)
+    
+    @property
+    def preserves_shape(self) -> bool:
+        """process_array 是否一定維持輸入形狀（不重採樣、不改變聲道數）
+        
+        維持形狀的處理器在 bytes 路徑中會以 process_into 直接寫入暫存區。
+        
+        Returns:
+            True 如果維持形狀，否則 False
+        """
+        return False
+    
+    def preserves_shape_for(self, sample_rate: int, channels: int) -> bool:
+        """對指定輸入格式的 process_array 是否維持輸入形狀
+        
+        預設與 preserves_shape 相同；輸出格式固定的處理器（如格式標準化）
+        可在輸入已符合目標格式時回傳 True。
+        
+        Args:
+            sample_rate: 輸入採樣率
+            channels: 輸入聲道數
+            
+        Returns:
+            True 如果維持形狀，否則 False
+        """
+        return self.preserves_shape
+    
+    @property
+    def supports_array(self) -> bool:
+        """是否支援直接處理 numpy array（process_array）
+        
+        Returns:
+            True 如果支援，否則 False
+        """
+        return False
+    
+    def process_array(self, audio_array: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """處理 float32 音訊陣列
+        
+        管線在所有處理器都支援時會以 float32 陣列串接各處理器，
+        只在入口與出口各做一次 bytes 轉換。
+        
+        Args:
+            audio_array: float32 音訊陣列（範圍 -1.0 ~ 1.0），形狀為 (samples,) 或 (samples, channels)
+            sample_rate: 採樣率
+            
+        Returns:
+            tuple: (處理後的音訊陣列, 處理後的採樣率)
+        """
+        raise NotImplementedError(f"{self.name} 不支援 process_array")
+    
+    def process_into(self, audio_array: np.ndarray, out: np.ndarray, sample_rate: int) -> np.ndarray:
+        """處理 float32 音訊陣列並將結果寫入預先配置的 out
+        
+        供串流管線在環形緩衝區內處理片段，避免每個片段配置新陣列。
+        預設實作呼叫 process_array 後複製到 out；子類可覆寫為直接寫入。
+        
+        Args:
+            audio_array: float32 音訊陣列
+            out: 預先配置的輸出陣列（形狀與輸入相同）
+            sample_rate: 採樣率
+            
+        Returns:
+            out
+            
+        Raises:
+            AudioProcessingError: 處理器改變了音訊形狀（如重採樣）
+        """
+        processed, _ = self.process_array(audio_array, sample_rate)
+        if processed.shape != out.shape:
+            raise AudioProcessingError(f"{self.name} 改變了音訊形狀，無法寫入預先配置的緩衝區")
+        np.copyto(out, processed, casting='unsafe')
+        return out
+    
+    def _process_bytes(self, audio_bytes: AudioBytes, sample_rate: int, channels: int) -> bytes:
+        """透過 process_array 處理 int16 PCM bytes
+        
+        Args:
+            audio_bytes: 原始音訊資料
+            sample_rate: 採樣率
+            channels: 聲道數
+            
+        Returns:
+            處理後的音訊資料
+        """
+        audio_array, _, _ = bytes_to_numpy(audio_bytes, sample_rate, channels)
+        audio = int16_to_float32(audio_array, out=self._buffer('f32_in', audio_array.shape, np.float32))
+        
+        if self.preserves_shape:
+            # 處理結果直接寫入暫存區，轉回 int16 時就地縮放
+            processed = self.process_into(audio, self._buffer('f32_out', audio.shape, np.float32), sample_rate)
+            work = processed
+        else:
+            processed, _ = self.process_array(audio, sample_rate)
+            work = self._buffer('f32_out', processed.shape, np.float32)
+        
+        # 轉回 int16 時沿用暫存區，只有最後的 tobytes 會配置新記憶體
+        pcm = float32_to_int16(processed, out=self._buffer('i16_out', processed.shape, np.int16), work=work)
+        return numpy_to_bytes(pcm)
+    
     @property
     def supports_streaming(self) -> bool:
         """是否支援串流處理
@@ -61,6 +249,50 @@ class AudioPreprocessor(ABC):
             # 如果支援串流，子類必須實作
             raise NotImplementedError(f"{self.name} 必須實作 process_streaming 方法")
         
-        # 預設行為：逐塊處理
-        async for chunk in audio_stream:
-            yield self.process(chunk)
\ No newline at end of file
+        # 預設行為：逐塊處理，處理與讀取下一個片段重疊進行
+        async for chunk in map_in_executor(audio_stream, self.process):
+            yield chunk
+
+
+_STREAM_END = object()
+
+
+async def map_in_executor(audio_stream: AsyncGenerator[bytes, None],
+                          func: Callable[[bytes], bytes],
+                          max_pending: int = 2) -> AsyncGenerator[bytes, None]:
+    """在執行緒池中逐塊處理串流，並由背景任務預先讀取後續片段
+    
+    讀取（網路/磁碟 I/O）與處理（numpy 運算會釋放 GIL）因此得以重疊，
+    每個片段的延遲從 I/O + 運算降為兩者中較長者。輸出順序與輸入相同。
+    
+    Args:
+        audio_stream: 音訊串流
+        func: 處理單一片段的同步函數
+        max_pending: 預先讀取的片段上限
+        
+    Yields:
+        處理後的音訊片段
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    
+    async def produce():
+        try:
+            async for chunk in audio_stream:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_STREAM_END)
+    
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield await loop.run_in_executor(None, func, item)
+    finally:
+        producer.cancel()
\ No newline at end of file
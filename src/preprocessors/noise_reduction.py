@@ -1,15 +1,206 @@
 """基礎降噪前處理器"""
 
+import math
+import threading
+import weakref
 import numpy as np
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Any, Optional, Tuple
 from .base import AudioPreprocessor
-from ..utils.audio import bytes_to_numpy, convert_to_mono, numpy_to_bytes, normalize_audio
+from ..utils.audio import AudioBytes, bytes_to_numpy, convert_to_mono, numpy_to_bytes, normalize_audio_array
 from ..utils.exceptions import AudioProcessingError
+from ..utils.jit import njit, prange, HAS_NUMBA
+
+try:
+    from scipy.ndimage import uniform_filter1d  # 單次掃描的 running-sum C 實作
+except ImportError:
+    uniform_filter1d = None
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+try:
+    from scipy.fft import rfft, irfft  # pocketfft，float32 輸入直接走單精度路徑
+except ImportError:
+    rfft = irfft = None
+
+try:
+    import numexpr  # 分塊、多執行緒的運算式融合
+except ImportError:
+    numexpr = None
+
+# int16 PCM 的範圍（模組常數，避免每次呼叫都建立 np.iinfo；
+# float32 版本避免與 float64 純量運算時升型）
+_INT16_MAX = 32767
+_INT16_MIN_F = np.float32(-32768.0)
+_INT16_MAX_F = np.float32(_INT16_MAX)
+
+# 低於此強度時降噪效果可忽略，直接略過整個處理
+_MIN_STRENGTH = 1e-3
+
+# 軟遮罩 sigmoid 查表：比值 0 ~ 4 每單位 1024 格，超過 4 時遮罩已趨近 1.0
+_SIGMOID_LUT_SIZE = 4096
+_SIGMOID_LUT_SCALE = 1024.0
+_SIGMOID_LUT = np.clip(
+    1.0 / (1.0 + np.exp(-5.0 * (np.arange(_SIGMOID_LUT_SIZE) / _SIGMOID_LUT_SCALE - 1.0))),
+    0.1, 1.0
+).astype(np.float32)
+
+# 頻域軟遮罩的 numexpr 運算式：幅度 → 比值 → sigmoid → 截斷在 0.1 以上
+# （比值低於 1 - ln(9)/5 時 sigmoid 小於 0.1；sigmoid 本身不超過 1.0）
+_SPECTRAL_MASK_EXPR = (
+    "where(sqrt(re * re + im * im) * inv < 0.56056, 0.1, "
+    "1 / (1 + exp(-5 * (sqrt(re * re + im * im) * inv - 1))))"
+)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _mean_abs_kernel(audio_array):
+    """單次掃描計算平均絕對值，不配置 np.abs 的中間陣列"""
+    if audio_array.size == 0:
+        return 0.0
+    total = 0.0
+    for i in prange(audio_array.size):
+        total += abs(audio_array[i])
+    return total / audio_array.size
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _soft_gate_kernel(audio_array, threshold, out):
+    """融合 能量 → 比值 → sigmoid 遮罩 → 截斷 → 相乘 為單一迴圈，結果寫入 out
+    
+    與 _create_soft_mask 的公式相同，但每個樣本只讀寫一次，不產生中間陣列。
+    """
+    inv_threshold = 1.0 / (threshold + 1e-8)
+    for i in prange(audio_array.shape[0]):
+        ratio = abs(audio_array[i]) * inv_threshold
+        mask = 1.0 / (1.0 + math.exp(-5.0 * (ratio - 1.0)))
+        if mask < 0.1:
+            mask = 0.1
+        elif mask > 1.0:
+            mask = 1.0
+        out[i] = audio_array[i] * mask
+    return out
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _soft_mask_kernel(energy, threshold, out):
+    """逐樣本計算 sigmoid 軟遮罩並截斷在 0.1 ~ 1.0，結果寫入 out"""
+    inv_threshold = 1.0 / (threshold + 1e-8)
+    for i in prange(energy.shape[0]):
+        mask = 1.0 / (1.0 + math.exp(-5.0 * (energy[i] * inv_threshold - 1.0)))
+        if mask < 0.1:
+            mask = 0.1
+        elif mask > 1.0:
+            mask = 1.0
+        out[i] = mask
+    return out
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _spectral_gate_kernel(spectrum, inv_threshold):
+    """融合 幅度 → 比值 → sigmoid 遮罩 → 截斷 → 相乘 為單一迴圈，就地修改頻譜
+    
+    spectrum 形狀為 (frames, bins)，inv_threshold 為每個頻率的閾值倒數。
+    """
+    for i in prange(spectrum.shape[0]):
+        for j in range(spectrum.shape[1]):
+            value = spectrum[i, j]
+            ratio = math.sqrt(value.real * value.real + value.imag * value.imag) * inv_threshold[j]
+            mask = 1.0 / (1.0 + math.exp(-5.0 * (ratio - 1.0)))
+            if mask < 0.1:
+                mask = 0.1
+            elif mask > 1.0:
+                mask = 1.0
+            spectrum[i, j] = value * np.float32(mask)
+    return spectrum
+
+
+@njit(cache=True, fastmath=True)
+def _one_pole_kernel(audio_array, alpha, out):
+    """單極點低通濾波 y[n] = a*y[n-1] + (1-a)*x[n]，初始狀態取第一個樣本（out 可為輸入本身）"""
+    y = audio_array[0]
+    gain = 1.0 - alpha
+    for i in range(audio_array.shape[0]):
+        y = alpha * y + gain * audio_array[i]
+        out[i] = y
+    return out
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _gate_smooth_kernel(audio_array, strength, window_size, noise_size, out, scratch):
+    """一次完成噪音估計、軟閾值遮罩與 boxcar 平滑，結果寫入 out
+    
+    噪音水平取前 noise_size 個樣本的平均絕對值（noise_size 為 0 時改用整段平均的 10%）；
+    平滑以 running sum 計算，邊界延伸與 uniform_filter1d 的 'nearest' 相同。
+    scratch 為與輸入同形狀的暫存陣列，out 可為輸入本身。
+    """
+    length = audio_array.shape[0]
+    
+    # 1. 估計噪音水平
+    count = noise_size if noise_size > 0 else length
+    total = 0.0
+    for i in prange(count):
+        total += abs(audio_array[i])
+    noise_level = total / max(count, 1)
+    if noise_size == 0:
+        noise_level *= 0.1
+    inv_threshold = 1.0 / (noise_level * (1.0 + strength) + 1e-8)
+    
+    # 2. 軟閾值遮罩
+    for i in prange(length):
+        mask = 1.0 / (1.0 + math.exp(-5.0 * (abs(audio_array[i]) * inv_threshold - 1.0)))
+        if mask < 0.1:
+            mask = 0.1
+        elif mask > 1.0:
+            mask = 1.0
+        scratch[i] = audio_array[i] * mask
+    
+    # 3. 移動平均（信號不長於窗口時不平滑，與 _apply_smoothing 相同）
+    if length <= window_size:
+        for i in range(length):
+            out[i] = scratch[i]
+        return out
+    half = window_size // 2
+    inv_window = 1.0 / window_size
+    running = 0.0
+    for k in range(-half, window_size - half):
+        running += scratch[min(max(k, 0), length - 1)]
+    out[0] = running * inv_window
+    for i in range(1, length):
+        running += scratch[min(i - half + window_size - 1, length - 1)] - scratch[max(i - half - 1, 0)]
+        out[i] = running * inv_window
+    return out
+
+
+@njit(cache=True)
+def _peak_normalize_kernel(audio_array, target_max, out):
+    """int16 峰值標準化：第一次掃描求最大絕對值，第二次以 Q15 定點整數縮放並飽和截斷寫入 out
+    
+    縮放因子只換算一次成 Q15 整數，逐樣本運算為整數乘法、加上捨入常數後右移 15 位
+    （同 pmulhrsw 的捨入方式），不經過浮點往返。
+    峰值為 0 時所有樣本皆為 0，以 max(peak, 1) 作除數即可避免除零，不需分支處理。
+    """
+    peak = 0
+    for i in range(audio_array.shape[0]):
+        peak = max(peak, abs(np.int32(audio_array[i])))
+    scale_q15 = np.int64(target_max * 32768.0 / max(peak, 1) + 0.5)
+    for i in range(audio_array.shape[0]):
+        value = (np.int64(audio_array[i]) * scale_q15 + 16384) >> 15
+        out[i] = np.int16(min(max(value, -32768), 32767))
+    return out
 
 
 class NoiseReductionProcessor(AudioPreprocessor):
     """基礎降噪前處理器"""
     
+    __slots__ = ('enabled', 'strength', 'sample_rate', 'frame_length', 'hop_length', 'smoothing',
+                 'method', 'per_channel', '_pool', '_pool_workers', '_pool_finalizer', '_pool_lock',
+                 '_window_size', '_smoothing_alpha', '__weakref__')
+    
     def __init__(self, config: Dict[str, Any]):
         """初始化降噪處理器
         
@@ -21,6 +212,13 @@ class NoiseReductionProcessor(AudioPreprocessor):
         self.sample_rate = int(config.get('sample_rate', 16000))
         self.frame_length = int(config.get('frame_length', 2048))
         self.hop_length = int(config.get('hop_length', 512))
+        self.smoothing = config.get('smoothing', 'boxcar')  # boxcar（移動平均）或 iir（單極點低通）
+        self.method = config.get('method', 'gate')  # gate（時域軟閾值）或 spectral（頻域軟閾值）
+        self.per_channel = bool(config.get('per_channel', False))  # 多聲道時各聲道獨立降噪
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_workers = 0
+        self._pool_finalizer: Optional[weakref.finalize] = None
+        self._pool_lock = threading.Lock()
         super().__init__(config)
     
     def _initialize(self):
@@ -31,13 +229,32 @@ class NoiseReductionProcessor(AudioPreprocessor):
         
         if self.sample_rate <= 0:
             raise AudioProcessingError("採樣率必須大於 0")
+        
+        if self.smoothing not in ('boxcar', 'iir'):
+            raise AudioProcessingError(f"不支援的平滑模式: {self.smoothing}")
+        
+        if self.method not in ('gate', 'spectral'):
+            raise AudioProcessingError(f"不支援的降噪方法: {self.method}")
+        
+        if self.method == 'spectral':
+            if rfft is None:
+                raise AudioProcessingError("頻域降噪需要安裝 scipy")
+            if not 0 < self.hop_length <= self.frame_length:
+                raise AudioProcessingError("hop_length 必須大於 0 且不超過 frame_length")
+        
+        # 平滑窗口（1ms）只依賴採樣率，初始化時計算一次
+        self._window_size = max(3, int(self.sample_rate * 0.001))
+        
+        # 單極點低通的係數（時間常數 1ms，與移動平均窗口相同）
+        self._smoothing_alpha = math.exp(-1.0 / (self.sample_rate * 1e-3))
     
     @property
     def name(self) -> str:
         """返回處理器名稱"""
         return "noise_reduction"
     
-    def process(self, audio_bytes: bytes, original_sample_rate: int = None, original_channels: int = None) -> bytes:
+    def process(self, audio_bytes: AudioBytes, *, original_sample_rate: Optional[int] = None,
+                original_channels: Optional[int] = None) -> bytes:
         """處理音訊進行降噪
         
         Args:
@@ -51,70 +268,349 @@ class NoiseReductionProcessor(AudioPreprocessor):
         Raises:
             AudioProcessingError: 處理失敗
         """
-        if not self.enabled:
-            return audio_bytes
+        if not self.enabled or self.strength < _MIN_STRENGTH:
+            return audio_bytes if isinstance(audio_bytes, bytes) else bytes(audio_bytes)
         
         try:
             # 使用原始參數或預設值
             sample_rate = original_sample_rate or self.sample_rate
             channels = original_channels or 1
             
-            # 轉換為 numpy array
-            audio_array, _, _ = bytes_to_numpy(audio_bytes, sample_rate, channels)
+            return self._process_bytes(audio_bytes, sample_rate, channels)
             
-            # 如果是多聲道，轉為單聲道處理
-            if len(audio_array.shape) > 1:
-                mono_array = convert_to_mono(audio_array)
-            else:
-                mono_array = audio_array
+        except AudioProcessingError:
+            raise
+        except Exception as e:
+            raise AudioProcessingError(f"降噪處理失敗: {e}") from e
+    
+    @property
+    def supports_array(self) -> bool:
+        """支援直接處理 numpy array"""
+        return True
+    
+    @property
+    def preserves_shape(self) -> bool:
+        """降噪不改變採樣率與聲道數"""
+        return True
+    
+    def process_array(self, audio_array: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """對 float32 音訊陣列進行降噪
+        
+        Args:
+            audio_array: float32 音訊陣列，形狀為 (samples,) 或 (samples, channels)
+            sample_rate: 採樣率
             
-            # 執行降噪
-            processed_mono = self._apply_noise_reduction(mono_array)
+        Returns:
+            tuple: (降噪後的音訊陣列, 採樣率)
+        """
+        if not self.enabled or self.strength < _MIN_STRENGTH:
+            return audio_array, sample_rate
+        
+        if self.per_channel and audio_array.ndim > 1 and audio_array.shape[1] > 1:
+            return self._apply_per_channel(audio_array), sample_rate
+        
+        # 如果是多聲道，轉為單聲道處理
+        if audio_array.ndim > 1:
+            mono_array = convert_to_mono(audio_array)
+        else:
+            mono_array = audio_array
+        
+        # 執行降噪
+        processed_mono = self._apply_noise_reduction(mono_array)
+        
+        # 如果原始是多聲道，復原多聲道（廣播後只複製一次）
+        if audio_array.ndim > 1:
+            processed_array = np.ascontiguousarray(
+                np.broadcast_to(processed_mono[:, None], (processed_mono.shape[0], audio_array.shape[1]))
+            )
+        else:
+            processed_array = processed_mono
+        
+        return processed_array, sample_rate
+    
+    def process_into(self, audio_array: np.ndarray, out: np.ndarray, sample_rate: int) -> np.ndarray:
+        """對單聲道 float32 音訊陣列降噪，結果直接寫入 out
+        
+        Args:
+            audio_array: float32 音訊陣列
+            out: 預先配置的輸出陣列（形狀與輸入相同）
+            sample_rate: 採樣率
             
-            # 如果原始是多聲道，復原多聲道（簡單複製）
-            if len(audio_array.shape) > 1 and channels > 1:
-                processed_array = np.column_stack([processed_mono] * channels)
-            else:
-                processed_array = processed_mono
+        Returns:
+            out
+        """
+        if audio_array.ndim > 1 or not self.enabled or self.strength < _MIN_STRENGTH:
+            return super().process_into(audio_array, out, sample_rate)
+        
+        return self._apply_noise_reduction(audio_array, out=out)
+    
+    def _apply_per_channel(self, audio_array: np.ndarray) -> np.ndarray:
+        """各聲道獨立降噪
+        
+        有 numba 時各聲道依序處理，每個聲道的 kernel 已經以 prange 使用所有核心；
+        再從多個執行緒同時呼叫平行 kernel 只會讓執行緒過量，且部分 threading layer
+        不支援這種呼叫方式。沒有 numba 時改在執行緒池中平行處理各聲道：
+        numpy/scipy 運算期間會釋放 GIL，暫存區也是每個執行緒各自一份。
+        
+        Args:
+            audio_array: float32 音訊陣列，形狀為 (samples, channels)
             
-            # 轉換回 bytes
-            return numpy_to_bytes(processed_array)
+        Returns:
+            降噪後的音訊陣列，形狀與輸入相同
+        """
+        # 轉為 (channels, samples)，每個聲道都是連續記憶體
+        channels_first = np.ascontiguousarray(audio_array.T)
+        processed = np.empty_like(channels_first)
+        
+        def run(channel: int) -> None:
+            self._apply_noise_reduction(channels_first[channel], out=processed[channel])
+        
+        channels = range(channels_first.shape[0])
+        if HAS_NUMBA:
+            for channel in channels:
+                run(channel)
+        else:
+            # list() 讓工作執行緒中的例外在此重新拋出
+            list(self._channel_pool(len(channels)).map(run, channels))
+        
+        return np.ascontiguousarray(processed.T)
+    
+    def _channel_pool(self, channels: int) -> ThreadPoolExecutor:
+        """取得聲道平行處理用的執行緒池，第一次使用時才建立，聲道數增加時重建
+        
+        Args:
+            channels: 聲道數
             
-        except Exception as e:
-            raise AudioProcessingError(f"降噪處理失敗: {str(e)}")
+        Returns:
+            執行緒池
+        """
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers < channels:
+                self._shutdown_pool()
+                self._pool = ThreadPoolExecutor(max_workers=channels, thread_name_prefix="noise_reduction")
+                self._pool_workers = channels
+                # 處理器被回收時關閉執行緒池（finalizer 不可持有 self）
+                self._pool_finalizer = weakref.finalize(self, self._pool.shutdown, wait=False)
+            return self._pool
+    
+    def _shutdown_pool(self) -> None:
+        """關閉目前的執行緒池（呼叫端需持有 _pool_lock）"""
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_finalizer = None
     
-    def _apply_noise_reduction(self, audio_array: np.ndarray) -> np.ndarray:
+    def close(self) -> None:
+        """釋放聲道平行處理的執行緒池，之後再使用時會重新建立"""
+        with self._pool_lock:
+            self._shutdown_pool()
+    
+    def _apply_noise_reduction(self, audio_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """應用降噪算法
         
         Args:
             audio_array: 音訊 numpy array
+            out: 預先配置的輸出陣列，None 時配置新陣列
             
         Returns:
             降噪後的音訊 array
         """
-        # 基礎降噪實作：頻譜減法方法的簡化版本
+        if self.method == 'spectral':
+            return self._apply_spectral_gating(audio_array, out=out)
         
-        # 1. 計算音訊的能量
-        energy = np.abs(audio_array)
+        # 基礎降噪實作：頻譜減法方法的簡化版本
         
-        # 2. 估計噪音水平（使用前面一小段音訊）
+        # 噪音估計只取前面一小段音訊
         noise_sample_size = min(len(audio_array) // 10, self.sample_rate // 2)
+        
+        if out is None:
+            out = np.empty_like(audio_array)
+        
+        if HAS_NUMBA and self.smoothing == 'boxcar':
+            # 單一 kernel 完成噪音估計、遮罩與平滑
+            return _gate_smooth_kernel(audio_array, self.strength, self._window_size, noise_sample_size,
+                                       out, self._buffer('gated', audio_array.shape, audio_array.dtype))
+        
+        # 1. 估計噪音水平（只對前面一小段音訊取絕對值）
         if noise_sample_size > 0:
-            noise_level = np.mean(energy[:noise_sample_size])
+            noise_level = self._mean_abs(audio_array[:noise_sample_size])
         else:
-            noise_level = np.mean(energy) * 0.1
+            noise_level = self._mean_abs(audio_array) * 0.1
         
-        # 3. 計算動態閾值
+        # 2. 計算動態閾值
         threshold = noise_level * (1 + self.strength)
         
-        # 4. 應用軟閾值降噪
-        mask = self._create_soft_mask(energy, threshold)
-        processed_audio = audio_array * mask
+        # 3. 應用軟閾值降噪
+        if HAS_NUMBA:
+            # 融合 kernel 在同一個迴圈中計算能量、遮罩與相乘
+            _soft_gate_kernel(audio_array, threshold, out)
+        else:
+            energy = np.abs(audio_array, out=self._buffer('energy', audio_array.shape, audio_array.dtype))
+            mask = self._create_soft_mask(energy, threshold)
+            np.multiply(audio_array, mask, out=out)
         
-        # 5. 平滑處理避免突然的音量變化
-        processed_audio = self._apply_smoothing(processed_audio)
+        # 4. 平滑處理避免突然的音量變化（就地寫回 out）
+        return self._apply_smoothing(out, out=out)
+    
+    def _apply_spectral_gating(self, audio_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """以短時傅立葉轉換在頻域套用軟閾值降噪
         
-        return processed_audio
+        分框、加窗、FFT 全程維持 float32/complex64，不經過雙精度；
+        噪音輪廓取前 10% 幀的平均幅度（每個頻率各一個閾值）。
+        
+        Args:
+            audio_array: 單聲道音訊 array
+            out: 預先配置的輸出陣列，None 時配置新陣列
+            
+        Returns:
+            降噪後的音訊 array
+        """
+        frame_length = self.frame_length
+        hop_length = self.hop_length
+        length = len(audio_array)
+        window = self._hann(frame_length)
+        
+        # 前後各補半個幀長（幀中心對齊樣本），尾端再補齊到整數個 hop
+        half = frame_length // 2
+        frames = -(-(length + 2 * half - frame_length) // hop_length) + 1
+        padded = self._buffer('stft_pad', ((frames - 1) * hop_length + frame_length,), np.float32)
+        padded.fill(0.0)
+        padded[half:half + length] = audio_array
+        
+        windowed = self._buffer('stft_frames', (frames, frame_length), np.float32)
+        np.multiply(sliding_window_view(padded, frame_length)[::hop_length], window, out=windowed)
+        spectrum = rfft(windowed, axis=-1, overwrite_x=True)
+        
+        # 每個頻率的噪音閾值
+        noise_frames = max(1, frames // 10)
+        threshold = np.abs(spectrum[:noise_frames]).mean(axis=0)
+        threshold *= 1 + self.strength
+        threshold += 1e-8  # 避免除零
+        
+        if HAS_NUMBA:
+            _spectral_gate_kernel(spectrum, (1.0 / threshold).astype(np.float32))
+        elif numexpr is not None:
+            # 無 numba 時以 numexpr 在一次分塊掃描中算出遮罩，取代 abs/除法/查表的多次全陣列掃描
+            mask = numexpr.evaluate(
+                _SPECTRAL_MASK_EXPR,
+                local_dict={'re': spectrum.real, 'im': spectrum.imag, 'inv': (1.0 / threshold).astype(np.float32)},
+                out=self._buffer('spectral_mask', spectrum.shape, np.float32),
+            )
+            spectrum *= mask
+        else:
+            ratio = np.abs(spectrum)
+            ratio /= threshold
+            flat_ratio = ratio.reshape(-1)
+            spectrum *= self._create_soft_mask(flat_ratio, 1.0).reshape(ratio.shape)
+        
+        # 逆轉換後以合成窗重疊相加，再除以窗平方和還原振幅
+        frames_out = irfft(spectrum, n=frame_length, axis=-1, overwrite_x=True)
+        frames_out *= window
+        padded.fill(0.0)
+        for frame in range(frames):
+            start = frame * hop_length
+            padded[start:start + frame_length] += frames_out[frame]
+        
+        window_sum = self._window_normalizer(window, hop_length, frames)
+        
+        if out is None:
+            out = np.empty(length, dtype=np.float32)
+        np.multiply(padded[half:half + length], window_sum[half:half + length], out=out)
+        return out
+    
+    def _window_normalizer(self, window: np.ndarray, hop_length: int, frames: int) -> np.ndarray:
+        """取得 frames 個幀重疊相加後的窗平方和倒數
+        
+        窗平方和只在前後各一個幀長內隨位置變化，中段以 hop 為週期重複；
+        快取只保存兩端與一個週期（與輸入長度無關），完整長度的係數每次在暫存區中組合。
+        
+        Args:
+            window: 分析/合成窗
+            hop_length: 幀移
+            frames: 幀數
+            
+        Returns:
+            每個樣本的正規化係數（暫存區，下次呼叫時會被覆寫）
+        """
+        frame_length = len(window)
+        total_length = (frames - 1) * hop_length + frame_length
+        if total_length < 2 * frame_length:
+            # 頭尾重疊的短輸入直接計算
+            return self._window_square_sum(window, hop_length, frames)
+        
+        head, period, tail = self._cached(
+            ('stft_window_edges', frame_length, hop_length),
+            lambda: self._window_normalizer_parts(window, hop_length)
+        )
+        
+        normalizer = self._buffer('stft_norm', (total_length,), np.float32)
+        normalizer[:frame_length] = head
+        normalizer[total_length - frame_length:] = tail
+        middle = normalizer[frame_length:total_length - frame_length]
+        periods = len(middle) // hop_length
+        middle[:periods * hop_length].reshape(periods, hop_length)[:] = period
+        middle[periods * hop_length:] = period[:len(middle) - periods * hop_length]
+        return normalizer
+    
+    @classmethod
+    def _window_normalizer_parts(cls, window: np.ndarray, hop_length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """計算窗平方和倒數的開頭、中段週期與結尾
+        
+        Args:
+            window: 分析/合成窗
+            hop_length: 幀移
+            
+        Returns:
+            tuple: (開頭一個幀長, 中段一個 hop 週期, 結尾一個幀長)
+        """
+        frame_length = len(window)
+        # 幀數足以讓頭尾之間至少有一個完整週期
+        frames = 2 * -(-frame_length // hop_length) + 1
+        reference = cls._window_square_sum(window, hop_length, frames)
+        head = reference[:frame_length].copy()
+        period = reference[frame_length:frame_length + hop_length].copy()
+        tail = reference[-frame_length:].copy()
+        for part in (head, period, tail):
+            part.setflags(write=False)
+        return head, period, tail
+    
+    @staticmethod
+    def _window_square_sum(window: np.ndarray, hop_length: int, frames: int) -> np.ndarray:
+        """計算合成窗平方重疊相加後的倒數（窗總和趨近 0 處設為 0）
+        
+        Args:
+            window: 分析/合成窗
+            hop_length: 幀移
+            frames: 幀數
+            
+        Returns:
+            每個樣本的正規化係數
+        """
+        frame_length = len(window)
+        total = np.zeros((frames - 1) * hop_length + frame_length, dtype=np.float32)
+        square = window * window
+        for frame in range(frames):
+            start = frame * hop_length
+            total[start:start + frame_length] += square
+        
+        inverse = np.zeros_like(total)
+        np.divide(1.0, total, out=inverse, where=total > 1e-6)
+        return inverse
+    
+    @staticmethod
+    def _mean_abs(audio_array: np.ndarray) -> float:
+        """計算平均絕對值
+        
+        Args:
+            audio_array: 音訊 array
+            
+        Returns:
+            平均絕對值
+        """
+        if HAS_NUMBA:
+            return _mean_abs_kernel(audio_array)
+        return float(np.mean(np.abs(audio_array)))
     
     def _create_soft_mask(self, energy: np.ndarray, threshold: float) -> np.ndarray:
         """創建軟遮罩進行平滑降噪
@@ -124,47 +620,109 @@ class NoiseReductionProcessor(AudioPreprocessor):
             threshold: 閾值
             
         Returns:
-            軟遮罩 array
+            軟遮罩 array（位於執行緒暫存區，下次呼叫時會被覆寫）
         """
-        # 軟閾值函數：漸進式降噪而非硬切
-        ratio = energy / (threshold + 1e-8)  # 避免除零
+        mask = self._buffer('mask', energy.shape, np.float32)
+        
+        if HAS_NUMBA:
+            # 單一平行迴圈直接計算 sigmoid，不需查表也不產生中間陣列
+            return _soft_mask_kernel(energy, threshold, mask)
         
-        # 使用 sigmoid 函數創建平滑遮罩
-        mask = 1.0 / (1.0 + np.exp(-5 * (ratio - 1)))
+        # 軟閾值函數：漸進式降噪而非硬切
+        # 比值直接換算為查表索引（四捨五入），以查表取代逐樣本的 exp；
+        # 每一步都寫入暫存區，不配置中間陣列
+        ratio = self._buffer('mask_ratio', energy.shape, energy.dtype)
+        np.multiply(energy, _SIGMOID_LUT_SCALE / (threshold + 1e-8), out=ratio)  # 避免除零
+        ratio += 0.5
+        np.minimum(ratio, _SIGMOID_LUT_SIZE - 1, out=ratio)
         
-        # 確保遮罩值在合理範圍內
-        mask = np.clip(mask, 0.1, 1.0)  # 保留至少 10% 的原始信號
+        index = self._buffer('mask_index', energy.shape, np.intp)
+        np.copyto(index, ratio, casting='unsafe')
         
-        return mask
+        # 查表值已截斷在 0.1 ~ 1.0（保留至少 10% 的原始信號）
+        # 索引已在範圍內；mode='clip' 讓 np.take 直接寫入 out 而不另建緩衝
+        return np.take(_SIGMOID_LUT, index, out=mask, mode='clip')
     
-    def _apply_smoothing(self, audio_array: np.ndarray) -> np.ndarray:
+    def _apply_smoothing(self, audio_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """應用平滑處理
         
         Args:
             audio_array: 音訊 array
+            out: 預先配置的輸出陣列（可為輸入本身），None 時配置新陣列
             
         Returns:
             平滑後的音訊 array
         """
-        # 簡單的移動平均平滑
-        window_size = max(3, int(self.sample_rate * 0.001))  # 1ms 窗口
+        # 簡單的移動平均平滑（1ms 窗口）
+        window_size = self._window_size
         
         if len(audio_array) <= window_size:
-            return audio_array
+            if out is None or out is audio_array:
+                return audio_array
+            np.copyto(out, audio_array)
+            return out
+        
+        if self.smoothing == 'iir':
+            return self._apply_iir_smoothing(audio_array, out=out)
+        
+        if out is None:
+            # 整數或 float64 輸入統一轉為 float32，已是 float32 時不複製
+            audio_array = audio_array.astype(np.float32, copy=False)
         
-        # 使用 numpy 的卷積進行移動平均
-        kernel = np.ones(window_size) / window_size
+        if uniform_filter1d is not None:
+            # 逐行緩衝的 running-sum C 實作，O(N) 與窗口大小無關；out 與輸入相同時也能就地計算
+            return uniform_filter1d(audio_array, size=window_size, mode='nearest', output=out)
         
-        # 處理邊界問題
-        padded_audio = np.pad(audio_array, window_size//2, mode='edge')
-        smoothed = np.convolve(padded_audio, kernel, mode='valid')
+        # 無 scipy 時以累積和計算移動平均，同樣是 O(N)
+        # 處理邊界問題：邊緣延伸寫入重複使用的暫存區，取代每次呼叫的 np.pad
+        half = window_size // 2
+        length = len(audio_array)
+        padded_audio = self._buffer('smooth_pad', (length + 2 * half,), np.float32)
+        padded_audio[:half] = audio_array[0]
+        padded_audio[half:half + length] = audio_array
+        padded_audio[half + length:] = audio_array[-1]
         
-        return smoothed[:len(audio_array)]
+        # 以 float64 累加避免長緩衝的累積誤差
+        cumulative = self._buffer('smooth_csum', (length + 2 * half + 1,), np.float64)
+        cumulative[0] = 0.0
+        np.cumsum(padded_audio, out=cumulative[1:])
+        window_sums = cumulative[window_size:window_size + length] - cumulative[:length]
+        
+        if out is None:
+            out = np.empty(length, dtype=np.float32)
+        np.multiply(window_sums, 1.0 / window_size, out=out, casting='unsafe')
+        return out
+    
+    def _apply_iir_smoothing(self, audio_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """以單極點 IIR 低通濾波平滑，每個樣本的運算量與窗口大小無關
+        
+        Args:
+            audio_array: 音訊 array
+            out: 預先配置的輸出陣列（可為輸入本身），None 時配置新陣列
+            
+        Returns:
+            平滑後的音訊 array
+        """
+        alpha = self._smoothing_alpha
+        
+        if not HAS_NUMBA and lfilter is not None:
+            # 初始狀態使 y[-1] = x[0]，避免開頭淡入
+            smoothed, _ = lfilter([1.0 - alpha], [1.0, -alpha], audio_array, zi=[alpha * audio_array[0]])
+            if out is None:
+                return smoothed.astype(audio_array.dtype, copy=False)
+            np.copyto(out, smoothed, casting='unsafe')
+            return out
+        
+        if out is None:
+            out = np.empty_like(audio_array)
+        return _one_pole_kernel(audio_array, alpha, out)
 
 
 class AudioNormalizer(AudioPreprocessor):
     """音訊格式標準化處理器"""
     
+    __slots__ = ('target_sample_rate', 'target_channels', 'normalize_volume', 'target_volume', '_target_max')
+    
     def __init__(self, config: Dict[str, Any]):
         """初始化標準化處理器
         
@@ -187,13 +745,17 @@ class AudioNormalizer(AudioPreprocessor):
         
         if not 0.0 <= self.target_volume <= 1.0:
             raise AudioProcessingError("目標音量必須在 0.0 到 1.0 之間")
+        
+        # 目標峰值（int16 刻度）只需計算一次
+        self._target_max = self.target_volume * _INT16_MAX
     
     @property
     def name(self) -> str:
         """返回處理器名稱"""
         return "audio_normalizer"
     
-    def process(self, audio_bytes: bytes, original_sample_rate: int = None, original_channels: int = None) -> bytes:
+    def process(self, audio_bytes: AudioBytes, *, original_sample_rate: Optional[int] = None,
+                original_channels: Optional[int] = None) -> bytes:
         """標準化音訊格式
         
         Args:
@@ -212,7 +774,7 @@ class AudioNormalizer(AudioPreprocessor):
             if original_sample_rate is None or original_channels is None:
                 if self.normalize_volume:
                     return self._normalize_volume(audio_bytes)
-                return audio_bytes
+                return audio_bytes if isinstance(audio_bytes, bytes) else bytes(audio_bytes)
             
             # 檢查是否需要轉換
             need_conversion = (
@@ -221,27 +783,74 @@ class AudioNormalizer(AudioPreprocessor):
             )
             
             if need_conversion:
-                # 基本格式標準化
-                normalized_bytes = normalize_audio(
-                    audio_bytes, 
-                    original_sample_rate,
-                    original_channels,
-                    self.target_sample_rate, 
-                    self.target_channels
-                )
-            else:
-                normalized_bytes = audio_bytes
+                # 格式轉換與音量標準化在 float32 陣列上一次完成
+                return self._process_bytes(audio_bytes, original_sample_rate, original_channels)
             
             # 音量標準化
             if self.normalize_volume:
-                normalized_bytes = self._normalize_volume(normalized_bytes)
+                return self._normalize_volume(audio_bytes)
             
-            return normalized_bytes
+            return audio_bytes if isinstance(audio_bytes, bytes) else bytes(audio_bytes)
             
+        except AudioProcessingError:
+            raise
         except Exception as e:
-            raise AudioProcessingError(f"音訊標準化失敗: {str(e)}")
+            raise AudioProcessingError(f"音訊標準化失敗: {e}") from e
+    
+    @property
+    def supports_array(self) -> bool:
+        """支援直接處理 numpy array"""
+        return True
+    
+    def preserves_shape_for(self, sample_rate: int, channels: int) -> bool:
+        """輸入已是目標格式時不重採樣、不改變聲道數"""
+        return sample_rate == self.target_sample_rate and channels == self.target_channels
+    
+    def process_array(self, audio_array: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """標準化 float32 音訊陣列的格式與音量
+        
+        Args:
+            audio_array: float32 音訊陣列，形狀為 (samples,) 或 (samples, channels)
+            sample_rate: 採樣率
+            
+        Returns:
+            tuple: (標準化後的音訊陣列, 目標採樣率)
+        """
+        channels = audio_array.shape[1] if audio_array.ndim > 1 else 1
+        
+        if sample_rate != self.target_sample_rate or channels != self.target_channels:
+            audio_array = normalize_audio_array(
+                audio_array,
+                sample_rate,
+                channels,
+                self.target_sample_rate,
+                self.target_channels
+            )
+        
+        if self.normalize_volume:
+            audio_array = self._normalize_volume_array(audio_array)
+        
+        return audio_array, self.target_sample_rate
+    
+    def _normalize_volume_array(self, audio_array: np.ndarray) -> np.ndarray:
+        """標準化 float32 音訊陣列的音量
+        
+        Args:
+            audio_array: float32 音訊陣列（範圍 -1.0 ~ 1.0）
+            
+        Returns:
+            音量標準化後的音訊陣列
+        """
+        current_max = np.max(np.abs(audio_array)) if audio_array.size else 0
+        
+        if current_max > 0:
+            # 與 int16 路徑一致：目標峰值為 target_volume * int16 最大值
+            target_max = self._target_max / 32768.0
+            audio_array = np.clip(audio_array * (target_max / current_max), -1.0, 1.0)
+        
+        return audio_array
     
-    def _normalize_volume(self, audio_bytes: bytes) -> bytes:
+    def _normalize_volume(self, audio_bytes: AudioBytes) -> bytes:
         """標準化音量
         
         Args:
@@ -250,34 +859,28 @@ class AudioNormalizer(AudioPreprocessor):
         Returns:
             音量標準化後的音訊資料
         """
-        try:
-            # 轉換為 numpy array - 使用目標格式
-            audio_array, _, _ = bytes_to_numpy(audio_bytes, self.target_sample_rate, self.target_channels)
-            
-            # 計算當前最大音量
-            current_max = np.max(np.abs(audio_array))
-            
-            if current_max > 0:
-                # 計算縮放因子
-                target_max = self.target_volume * np.iinfo(np.int16).max
-                scale_factor = target_max / current_max
-                
-                # 應用縮放，但避免超出範圍
-                if scale_factor > 1.0:
-                    scale_factor = min(scale_factor, target_max / current_max)
-                
-                normalized_array = audio_array * scale_factor
-                
-                # 確保在有效範圍內
-                normalized_array = np.clip(
-                    normalized_array, 
-                    np.iinfo(np.int16).min, 
-                    np.iinfo(np.int16).max
-                )
-            else:
-                normalized_array = audio_array
-            
-            return numpy_to_bytes(normalized_array.astype(np.int16))
+        # 轉換為 numpy array - 使用目標格式
+        audio_array, _, _ = bytes_to_numpy(audio_bytes, self.target_sample_rate, self.target_channels)
+        
+        if HAS_NUMBA:
+            # 兩次掃描的整數定點 kernel，直接寫入 int16 暫存區
+            flat = audio_array.reshape(-1)
+            pcm = _peak_normalize_kernel(flat, self._target_max, self._buffer('i16_out', flat.shape, np.int16))
+            return numpy_to_bytes(pcm)
+        
+        # 全程使用 float32，縮放與截斷都就地進行，不產生 float64 中間陣列
+        normalized_array = audio_array.astype(np.float32)
+        
+        # 計算當前最大音量
+        current_max = np.max(np.abs(normalized_array)) if normalized_array.size else 0
+        
+        if current_max > 0:
+            # 縮放到目標峰值
+            scale_factor = self._target_max / current_max
+            np.multiply(normalized_array, np.float32(scale_factor), out=normalized_array)
+            np.rint(normalized_array, out=normalized_array)
             
-        except Exception as e:
-            raise AudioProcessingError(f"音量標準化失敗: {str(e)}")
\ No newline at end of file
+            # 確保在有效範圍內
+            np.clip(normalized_array, _INT16_MIN_F, _INT16_MAX_F, out=normalized_array)
+        
+        return numpy_to_bytes(normalized_array.astype(np.int16))
\ No newline at end of file
@@ -1,18 +1,40 @@
 """音訊處理工具函數"""
 
+import io
+import wave
+from functools import lru_cache
 import numpy as np
-from typing import Tuple, Optional
+from math import gcd
+from typing import Tuple, Optional, Union
 from .exceptions import InvalidAudioFormatError, AudioProcessingError
+from .jit import njit, prange, HAS_NUMBA
 
+try:
+    import soxr  # SIMD 最佳化的 C 重採樣函式庫
+except ImportError:
+    soxr = None
 
-def bytes_to_numpy(audio_bytes: bytes, 
+try:
+    from scipy.signal import firwin, resample_poly
+except ImportError:
+    firwin = resample_poly = None
+
+
+# 可直接以 np.frombuffer 解碼的音訊資料：bytes、bytearray 或 memoryview
+# （ndarray 請以 memoryview(arr) 傳入；validate_audio_format 不接受 ndarray）
+AudioBytes = Union[bytes, bytearray, memoryview]
+
+
+def bytes_to_numpy(audio_bytes: AudioBytes, 
                   sample_rate: int = 16000, 
                   channels: int = 1,
                   dtype: str = 'int16') -> tuple:
     """將音訊 bytes 轉換為 numpy array
     
+    回傳的陣列與輸入共用記憶體，不複製資料。
+    
     Args:
-        audio_bytes: 音訊資料（bytes格式）
+        audio_bytes: 音訊資料（bytes 或 C 連續的 bytes-like 物件）
         sample_rate: 採樣率
         channels: 聲道數
         dtype: 資料類型
@@ -23,24 +45,30 @@ def bytes_to_numpy(audio_bytes: bytes,
     Raises:
         InvalidAudioFormatError: 音訊格式無效
     """
-    try:
-        if dtype == 'int16':
-            audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
-        elif dtype == 'float32':
-            audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
-        else:
-            raise InvalidAudioFormatError(f"不支援的資料類型: {dtype}")
-        
-        # 如果是多聲道，重新整形
-        if channels > 1:
-            if len(audio_array) % channels != 0:
-                # 截斷到正確的長度
-                audio_array = audio_array[:-(len(audio_array) % channels)]
-            audio_array = audio_array.reshape(-1, channels)
-            
-        return audio_array, sample_rate, channels
-    except Exception as e:
-        raise InvalidAudioFormatError(f"音訊格式轉換失敗: {str(e)}")
+    if dtype == 'int16':
+        np_dtype = np.int16
+    elif dtype == 'float32':
+        np_dtype = np.float32
+    else:
+        raise InvalidAudioFormatError(f"不支援的資料類型: {dtype}")
+    
+    # 事先檢查長度，取代以 try/except 包住 np.frombuffer
+    # memoryview 的 len 是元素個數而非位元組數，統一以 nbytes 計算
+    itemsize = np.dtype(np_dtype).itemsize
+    nbytes = len(audio_bytes) if isinstance(audio_bytes, bytes) else memoryview(audio_bytes).nbytes
+    if nbytes % itemsize != 0:
+        raise InvalidAudioFormatError(f"音訊資料長度 {nbytes} 不是樣本大小 {itemsize} 的倍數")
+    
+    audio_array = np.frombuffer(audio_bytes, dtype=np_dtype)
+    
+    # 如果是多聲道，重新整形
+    if channels > 1:
+        if len(audio_array) % channels != 0:
+            # 截斷到正確的長度
+            audio_array = audio_array[:-(len(audio_array) % channels)]
+        audio_array = audio_array.reshape(-1, channels)
+        
+    return audio_array, sample_rate, channels
 
 
 def numpy_to_bytes(audio_array: np.ndarray, dtype: str = 'int16') -> bytes:
@@ -54,21 +82,129 @@ def numpy_to_bytes(audio_array: np.ndarray, dtype: str = 'int16') -> bytes:
         bytes 格式的音訊資料
         
     Raises:
-        InvalidAudioFormatError: 轉換失敗
+        InvalidAudioFormatError: 不支援的資料類型
     """
-    try:
-        # 確保 array 是連續的
-        if not audio_array.flags.c_contiguous:
-            audio_array = np.ascontiguousarray(audio_array)
-            
-        if dtype == 'int16':
-            return audio_array.astype(np.int16).tobytes()
-        elif dtype == 'float32':
-            return audio_array.astype(np.float32).tobytes()
-        else:
-            raise InvalidAudioFormatError(f"不支援的資料類型: {dtype}")
-    except Exception as e:
-        raise InvalidAudioFormatError(f"音訊格式轉換失敗: {str(e)}")
+    if dtype == 'int16':
+        target_dtype = np.int16
+    elif dtype == 'float32':
+        target_dtype = np.float32
+    else:
+        raise InvalidAudioFormatError(f"不支援的資料類型: {dtype}")
+    
+    # dtype 已相符時直接輸出，tobytes 對非連續陣列也只複製一次（C 順序）
+    if audio_array.dtype == target_dtype:
+        return audio_array.tobytes()
+    return audio_array.astype(target_dtype).tobytes()
+
+
+def pcm_to_wav_bytes(audio_bytes: bytes, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """為 int16 PCM 資料加上 WAV 檔頭
+    
+    Args:
+        audio_bytes: int16 PCM 音訊資料
+        sample_rate: 採樣率
+        channels: 聲道數
+        
+    Returns:
+        WAV 格式的音訊資料
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(audio_bytes)
+    return buffer.getvalue()
+
+
+_INT16_TO_FLOAT32 = np.float32(1.0 / 32768.0)
+
+
+@njit(cache=True, fastmath=True)
+def _int16_to_float32_kernel(audio_array, out):
+    """int16 → float32 縮放（一維、連續陣列），迴圈由 LLVM 自動向量化"""
+    scale = np.float32(1.0 / 32768.0)
+    for i in range(audio_array.shape[0]):
+        out[i] = np.float32(audio_array[i]) * scale
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _float32_to_int16_kernel(audio_array, scale, out):
+    """float32 → int16 縮放、四捨五入並飽和截斷（一維、連續陣列），在同一個迴圈完成"""
+    for i in range(audio_array.shape[0]):
+        value = np.rint(audio_array[i] * scale)
+        if value > np.float32(32767.0):
+            value = np.float32(32767.0)
+        elif value < np.float32(-32768.0):
+            value = np.float32(-32768.0)
+        out[i] = np.int16(value)
+    return out
+
+
+def int16_to_float32(audio_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """將 int16 PCM 陣列轉為 float32（範圍 -1.0 ~ 1.0）
+    
+    轉型與縮放在同一次掃描中完成，不產生中間陣列。
+    
+    Args:
+        audio_array: int16 音訊陣列
+        out: 預先配置的 float32 輸出陣列（形狀需與輸入相同）
+        
+    Returns:
+        float32 音訊陣列
+    """
+    if HAS_NUMBA and audio_array.flags.c_contiguous and (out is None or out.flags.c_contiguous):
+        if out is None:
+            out = np.empty(audio_array.shape, dtype=np.float32)
+        _int16_to_float32_kernel(audio_array.reshape(-1), out.reshape(-1))
+        return out
+    
+    return np.multiply(audio_array, _INT16_TO_FLOAT32, out=out, dtype=np.float32)
+
+
+def float32_to_int16(audio_array: np.ndarray,
+                     out: Optional[np.ndarray] = None,
+                     work: Optional[np.ndarray] = None,
+                     scale: float = 32768.0) -> np.ndarray:
+    """將 float32 音訊陣列（範圍 -1.0 ~ 1.0）轉回 int16 PCM，四捨五入到最近的整數，超出範圍的值會被截斷
+    
+    Args:
+        audio_array: float32 音訊陣列
+        out: 預先配置的 int16 輸出陣列（形狀需與輸入相同）
+        work: 預先配置的 float32 暫存陣列（形狀需與輸入相同），可為輸入本身
+        scale: 縮放比例，預設 32768（與 int16_to_float32 互逆）
+        
+    Returns:
+        int16 音訊陣列
+    """
+    if HAS_NUMBA and audio_array.flags.c_contiguous and (out is None or out.flags.c_contiguous):
+        # 單次掃描完成縮放、飽和截斷與轉型，不需要 work 暫存
+        if out is None:
+            out = np.empty(audio_array.shape, dtype=np.int16)
+        _float32_to_int16_kernel(audio_array.reshape(-1), np.float32(scale), out.reshape(-1))
+        return out
+    
+    scaled = np.multiply(audio_array, np.float32(scale), out=work, dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    if out is None:
+        return scaled.astype(np.int16)
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _to_mono_int16_kernel(audio_array):
+    """int16 多聲道降混：整數累加後向下取整除以聲道數"""
+    frames, channels = audio_array.shape
+    out = np.empty(frames, dtype=np.int16)
+    for i in prange(frames):
+        total = 0
+        for c in range(channels):
+            total += audio_array[i, c]
+        out[i] = total // channels
+    return out
 
 
 def convert_to_mono(audio_array: np.ndarray) -> np.ndarray:
@@ -83,6 +219,16 @@ def convert_to_mono(audio_array: np.ndarray) -> np.ndarray:
     if len(audio_array.shape) == 1:
         return audio_array  # 已經是單聲道
     elif len(audio_array.shape) == 2:
+        if audio_array.dtype == np.int16:
+            # int16 在整數域內加總，避免 np.mean 升型為 float64（結果向下取整）
+            if HAS_NUMBA:
+                return _to_mono_int16_kernel(audio_array)
+            if audio_array.shape[1] == 2:
+                summed = audio_array[:, 0].astype(np.int32) + audio_array[:, 1]
+                return (summed >> 1).astype(np.int16)
+            summed = np.sum(audio_array, axis=1, dtype=np.int32)
+            return (summed // audio_array.shape[1]).astype(np.int16)
+        
         # 多聲道取平均
         return np.mean(audio_array, axis=1).astype(audio_array.dtype)
     else:
@@ -107,32 +253,132 @@ def normalize_audio(audio_bytes: bytes,
         標準化後的音訊資料
         
     Raises:
-        AudioProcessingError: 處理失敗
+        InvalidAudioFormatError: 音訊格式無效
+        AudioProcessingError: 不支援的音訊陣列形狀
     """
-    try:
-        # 將 bytes 轉為 numpy array
-        audio_array, _, _ = bytes_to_numpy(audio_bytes, original_sample_rate, original_channels)
+    # 將 bytes 轉為 numpy array
+    audio_array, _, _ = bytes_to_numpy(audio_bytes, original_sample_rate, original_channels)
+    
+    audio_array = normalize_audio_array(
+        audio_array,
+        original_sample_rate,
+        original_channels,
+        target_sample_rate,
+        target_channels
+    )
+    
+    return numpy_to_bytes(audio_array)
+
+
+def normalize_audio_array(audio_array: np.ndarray,
+                          original_sample_rate: int,
+                          original_channels: int,
+                          target_sample_rate: int = 16000,
+                          target_channels: int = 1) -> np.ndarray:
+    """標準化音訊陣列格式（聲道數與採樣率）
+    
+    降混在重採樣之前、升混在重採樣之後進行，讓重採樣濾波只處理較少的聲道。
+    
+    Args:
+        audio_array: 原始音訊陣列
+        original_sample_rate: 原始採樣率
+        original_channels: 原始聲道數
+        target_sample_rate: 目標採樣率
+        target_channels: 目標聲道數
         
-        # 轉換聲道數
-        if original_channels > 1 and target_channels == 1:
-            audio_array = convert_to_mono(audio_array)
-        elif original_channels == 1 and target_channels > 1:
-            # 單聲道轉多聲道（複製）
-            audio_array = np.column_stack([audio_array] * target_channels)
+    Returns:
+        標準化後的音訊陣列
+    """
+    # 多聲道轉單聲道（先降混）
+    if original_channels > 1 and target_channels == 1:
+        audio_array = convert_to_mono(audio_array)
+    
+    # 採樣率轉換
+    if original_sample_rate != target_sample_rate:
+        audio_array = resample(audio_array, original_sample_rate, target_sample_rate)
+    
+    # 單聲道轉多聲道（最後升混，廣播後只複製一次）
+    if original_channels == 1 and target_channels > 1:
+        audio_array = np.ascontiguousarray(
+            np.broadcast_to(audio_array.reshape(-1, 1), (audio_array.shape[0], target_channels))
+        )
+    
+    return audio_array
+
+
+def resample(audio_array: np.ndarray,
+             original_rate: int,
+             target_rate: int,
+             quality: str = 'HQ') -> np.ndarray:
+    """重採樣音訊陣列
+    
+    優先使用 soxr，其次為 scipy 多相位濾波，兩者皆未安裝時退回線性插值。
+    
+    Args:
+        audio_array: 原始音訊陣列，形狀為 (samples,) 或 (samples, channels)
+        original_rate: 原始採樣率
+        target_rate: 目標採樣率
+        quality: soxr 品質等級（VHQ, HQ, MQ, LQ, QQ）
         
-        # 簡單的採樣率轉換（線性插值）
-        if original_sample_rate != target_sample_rate:
-            audio_array = _resample_audio(audio_array, original_sample_rate, target_sample_rate)
+    Returns:
+        重採樣後的音訊陣列（維持原始 dtype）
+    """
+    if original_rate == target_rate:
+        return audio_array
+    
+    if soxr is not None:
+        return soxr.resample(audio_array, original_rate, target_rate, quality=quality)
+    
+    return _resample_audio(audio_array, original_rate, target_rate)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _resample_linear_kernel(audio_array, new_length):
+    """線性插值重採樣（單聲道），取樣點與 np.interp 搭配 np.linspace 相同"""
+    out = np.empty(new_length, dtype=audio_array.dtype)
+    length = audio_array.shape[0]
+    if length == 0:
+        return out
+    scale = (length - 1) / (new_length - 1) if new_length > 1 else 0.0
+    for i in prange(new_length):
+        position = i * scale
+        j = int(position)
+        if j + 1 < length:
+            frac = position - j
+            out[i] = audio_array[j] * (1.0 - frac) + audio_array[j + 1] * frac
+        else:
+            out[i] = audio_array[length - 1]
+    return out
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int, dtype: str) -> np.ndarray:
+    """設計並快取多相位重採樣的低通 FIR 濾波器
+    
+    與 resample_poly 預設設計相同（Kaiser 窗、beta=5.0、每側 10 個週期），
+    同一組 (up, down) 只需設計一次。
+    
+    Args:
+        up: 升採樣倍數
+        down: 降採樣倍數
+        dtype: 濾波器係數的資料類型
         
-        return numpy_to_bytes(audio_array)
-    except Exception as e:
-        raise AudioProcessingError(f"音訊標準化失敗: {str(e)}")
+    Returns:
+        唯讀的濾波器係數
+    """
+    max_rate = max(up, down)
+    taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0)).astype(dtype)
+    taps.setflags(write=False)
+    return taps
 
 
 def _resample_audio(audio_array: np.ndarray, 
                    original_rate: int, 
                    target_rate: int) -> np.ndarray:
-    """簡單的音訊重採樣
+    """音訊重採樣（不依賴 soxr）
+    
+    使用 scipy 的多相位 FIR 濾波（含抗混疊），所有聲道在同一次 C 呼叫中處理；
+    scipy 未安裝時退回線性插值。
     
     Args:
         audio_array: 原始音訊陣列
@@ -145,23 +391,81 @@ def _resample_audio(audio_array: np.ndarray,
     if original_rate == target_rate:
         return audio_array
     
+    if resample_poly is not None:
+        g = gcd(original_rate, target_rate)
+        up, down = target_rate // g, original_rate // g
+        dtype = audio_array.dtype if np.issubdtype(audio_array.dtype, np.floating) else np.float64
+        taps = _polyphase_filter(up, down, np.dtype(dtype).str)
+        resampled = resample_poly(audio_array, up, down, axis=0, window=taps)
+        if np.issubdtype(audio_array.dtype, np.integer):
+            # FIR 濾波在滿刻度附近會過衝，轉回整數前先四捨五入並飽和截斷，避免溢位繞回
+            info = np.iinfo(audio_array.dtype)
+            np.rint(resampled, out=resampled)
+            np.clip(resampled, info.min, info.max, out=resampled)
+        return resampled.astype(audio_array.dtype, copy=False)
+    
     # 計算新的長度
     ratio = target_rate / original_rate
     new_length = int(len(audio_array) * ratio)
     
-    # 線性插值重採樣
-    old_indices = np.linspace(0, len(audio_array) - 1, len(audio_array))
-    new_indices = np.linspace(0, len(audio_array) - 1, new_length)
+    if HAS_NUMBA:
+        # 單次掃描的線性插值，不配置索引陣列
+        if len(audio_array.shape) > 1:
+            resampled = np.empty((new_length, audio_array.shape[1]), dtype=audio_array.dtype)
+            for channel in range(audio_array.shape[1]):
+                resampled[:, channel] = _resample_linear_kernel(
+                    np.ascontiguousarray(audio_array[:, channel]), new_length
+                )
+            return resampled
+        return _resample_linear_kernel(audio_array, new_length)
     
-    # 如果是多聲道
+    # 線性插值重採樣：取樣點等距，左鄰索引直接取整數部分，
+    # 所有聲道以廣播一次完成，不逐聲道呼叫 np.interp
+    length = len(audio_array)
+    new_indices = np.linspace(0, length - 1, new_length)
+    lower = new_indices.astype(np.intp)
+    np.minimum(lower, max(length - 2, 0), out=lower)
+    upper = np.minimum(lower + 1, max(length - 1, 0))
+    
+    work_dtype = audio_array.dtype if np.issubdtype(audio_array.dtype, np.floating) else np.float32
+    frac = (new_indices - lower).astype(work_dtype)
     if len(audio_array.shape) > 1:
-        resampled = np.zeros((new_length, audio_array.shape[1]), dtype=audio_array.dtype)
-        for channel in range(audio_array.shape[1]):
-            resampled[:, channel] = np.interp(new_indices, old_indices, audio_array[:, channel])
-    else:
-        resampled = np.interp(new_indices, old_indices, audio_array)
+        frac = frac[:, None]
     
-    return resampled.astype(audio_array.dtype)
+    low = audio_array[lower].astype(work_dtype, copy=False)
+    high = audio_array[upper].astype(work_dtype, copy=False)
+    resampled = low + (high - low) * frac
+    
+    return resampled.astype(audio_array.dtype, copy=False)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _rms_kernel(audio_array):
+    """單次掃描計算 RMS：轉型、平方、加總合併為一個迴圈，不配置中間陣列"""
+    total = 0.0
+    for i in prange(audio_array.size):
+        value = float(audio_array[i])
+        total += value * value
+    return (total / audio_array.size) ** 0.5
+
+
+def calculate_rms(audio_array: np.ndarray) -> float:
+    """計算音訊的均方根（RMS）值
+    
+    Args:
+        audio_array: 音訊陣列（任意形狀與數值型別）
+        
+    Returns:
+        RMS 值，單位與輸入相同
+    """
+    flat = audio_array.reshape(-1)
+    if flat.size == 0:
+        return 0.0
+    
+    if HAS_NUMBA:
+        return float(_rms_kernel(flat))
+    
+    return float(np.sqrt(np.mean(np.square(flat, dtype=np.float64))))
 
 
 def get_audio_info(audio_bytes: bytes, sample_rate: int = 16000, channels: int = 1) -> dict:
@@ -192,11 +496,13 @@ def get_audio_info(audio_bytes: bytes, sample_rate: int = 16000, channels: int =
         return {'error': str(e)}
 
 
-def validate_audio_format(audio_bytes: bytes, 
+def validate_audio_format(audio_bytes: AudioBytes, 
                          min_size: int = 1024,
                          max_size: Optional[int] = None) -> bool:
     """驗證音訊格式是否有效
     
+    只檢查長度，不解碼資料：int16 PCM 的 np.frombuffer 僅在長度不是 2 的倍數時失敗。
+    
     Args:
         audio_bytes: 音訊資料
         min_size: 最小檔案大小（bytes）
@@ -205,15 +511,14 @@ def validate_audio_format(audio_bytes: bytes,
     Returns:
         True 如果格式有效，否則 False
     """
-    try:
-        if len(audio_bytes) < min_size:
-            return False
-            
-        if max_size and len(audio_bytes) > max_size:
-            return False
-            
-        # 嘗試轉換為 numpy array 來驗證格式
-        bytes_to_numpy(audio_bytes)
-        return True
-    except Exception:
-        return False
\ No newline at end of file
+    if not isinstance(audio_bytes, (bytes, bytearray, memoryview)):
+        return False
+    
+    size = audio_bytes.nbytes if isinstance(audio_bytes, memoryview) else len(audio_bytes)
+    if size < min_size:
+        return False
+    
+    if max_size and size > max_size:
+        return False
+    
+    return size % 2 == 0
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""Numba JIT 相容層
+
+numba 為選用依賴；未安裝時 njit 退化為不做任何事的裝飾器、prange 退化為 range，
+使用端應以 HAS_NUMBA 判斷是否改走 numpy 向量化路徑。
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """numba.njit 的替代品：直接返回原函數"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator
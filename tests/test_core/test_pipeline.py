@@ -1,11 +1,16 @@
 """測試音訊處理管線功能"""
 
+import asyncio
 import pytest
+import numpy as np
 from typing import Dict, Any
-from src.core.pipeline import AudioPipeline, AudioPipelineManager
+from src.core.pipeline import AudioPipeline, AudioPipelineManager, AudioStream
 from src.core.registry import ComponentRegistry
+from src.engines.base import ASREngine
 from src.preprocessors.base import AudioPreprocessor
-from src.utils.exceptions import PreprocessorError
+from src.preprocessors.noise_reduction import NoiseReductionProcessor, AudioNormalizer
+from src.utils.audio import float32_to_int16
+from src.utils.exceptions import PreprocessorError, AudioProcessingError
 
 
 class MockPreprocessor(AudioPreprocessor):
@@ -22,11 +27,25 @@ class MockPreprocessor(AudioPreprocessor):
     def name(self) -> str:
         return self.test_name
     
-    def process(self, audio_bytes: bytes) -> bytes:
+    def process(self, audio_bytes: bytes, *, original_sample_rate=None, original_channels=None) -> bytes:
         # 簡單的測試處理：在音訊前加上處理器名稱
         return f"{self.name}:".encode() + audio_bytes
 
 
+class MockEngine(ASREngine):
+    """模擬 ASR 引擎，用於測試"""
+    
+    def _initialize(self):
+        pass
+    
+    @property
+    def name(self) -> str:
+        return "mock"
+    
+    def transcribe(self, audio_bytes: bytes, **kwargs) -> str:
+        return ""
+
+
 class TestAudioPipeline:
     """測試 AudioPipeline 類"""
     
@@ -65,6 +84,133 @@ class TestAudioPipeline:
         assert result == b"test2:test1:test_audio"
         assert len(pipeline) == 2
         assert str(pipeline) == "Pipeline: test1 -> test2"
+    
+    def test_streaming_pipeline(self):
+        """測試串流處理：每個片段依序通過所有處理器"""
+        pipeline = AudioPipeline([
+            MockPreprocessor({'name': 'test1'}),
+            MockPreprocessor({'name': 'test2'})
+        ])
+        
+        async def audio_stream():
+            for chunk in (b"a", b"b"):
+                yield chunk
+        
+        async def collect():
+            return [chunk async for chunk in pipeline.process_streaming(audio_stream())]
+        
+        assert asyncio.run(collect()) == [b"test2:test1:a", b"test2:test1:b"]
+    
+    def test_streaming_pipeline_propagates_source_error(self):
+        """測試串流來源發生錯誤時由管線拋出"""
+        pipeline = AudioPipeline([MockPreprocessor({'name': 'test1'})])
+        
+        async def audio_stream():
+            yield b"a"
+            raise RuntimeError("來源中斷")
+        
+        async def collect():
+            return [chunk async for chunk in pipeline.process_streaming(audio_stream())]
+        
+        with pytest.raises(AudioProcessingError):
+            asyncio.run(collect())
+    
+    def test_array_pipeline(self):
+        """測試所有處理器支援 numpy array 時以陣列串接處理"""
+        normalizer = AudioNormalizer({'target_sample_rate': 16000, 'target_channels': 1})
+        noise = NoiseReductionProcessor({'sample_rate': 16000})
+        pipeline = AudioPipeline([normalizer, noise])
+        
+        # 48 kHz 立體聲輸入
+        t = np.arange(4800) / 48000
+        stereo = np.empty((len(t), 2), dtype=np.float32)
+        stereo[:] = np.sin(2 * np.pi * 440 * t)[:, None]
+        audio_bytes = (stereo * 16000).astype(np.int16).tobytes()
+        
+        result = pipeline.process(audio_bytes, original_sample_rate=48000, original_channels=2)
+        
+        # 輸出應為 16 kHz 單聲道
+        result_array = np.frombuffer(result, dtype=np.int16)
+        assert len(result_array) == 1600
+        assert np.max(np.abs(result_array)) > 0
+    
+    def test_array_pipeline_keeps_float32(self):
+        """測試陣列階段之間維持 float32"""
+        class Float64Preprocessor(MockPreprocessor):
+            supports_array = True
+            
+            def process_array(self, audio_array, sample_rate):
+                self.received_dtype = audio_array.dtype
+                return audio_array.astype(np.float64), sample_rate
+        
+        first = Float64Preprocessor({'name': 'first'})
+        second = Float64Preprocessor({'name': 'second'})
+        pipeline = AudioPipeline([first, second])
+        
+        audio_bytes = np.full(160, 1000, dtype=np.int16).tobytes()
+        result = pipeline.process(audio_bytes, original_sample_rate=16000, original_channels=1)
+        
+        assert first.received_dtype == np.float32
+        assert second.received_dtype == np.float32
+        assert result == audio_bytes
+    
+    def test_process_into_ring_buffer(self):
+        """測試以環形緩衝區處理串流片段，結果與一般處理一致"""
+        normalizer = AudioNormalizer({'target_sample_rate': 16000, 'target_channels': 1})
+        noise = NoiseReductionProcessor({'sample_rate': 16000})
+        pipeline = AudioPipeline([normalizer, noise])
+        stream = AudioStream(1600 * 8)
+        
+        t = np.arange(1600) / 16000
+        for gain in (4000, 8000, 12000):
+            chunk = (np.sin(2 * np.pi * 440 * t) * gain).astype(np.int16).tobytes()
+            
+            result = pipeline.process_into(chunk, stream, 16000, 1)
+            
+            assert np.shares_memory(result, stream.buffer)
+            expected = pipeline.process(chunk, original_sample_rate=16000, original_channels=1)
+            assert float32_to_int16(result).tobytes() == expected
+    
+    def test_process_into_rejects_small_buffer(self):
+        """測試環形緩衝區容量不足時拋出錯誤"""
+        pipeline = AudioPipeline([NoiseReductionProcessor({'sample_rate': 16000})])
+        
+        with pytest.raises(AudioProcessingError):
+            pipeline.process_into(np.zeros(1600, dtype=np.int16).tobytes(), AudioStream(1600), 16000, 1)
+    
+    def test_process_into_rejects_reshaping_processor(self):
+        """測試會重採樣的處理器在配置環形緩衝區區段之前就被拒絕"""
+        normalizer = AudioNormalizer({'target_sample_rate': 16000, 'target_channels': 1})
+        noise = NoiseReductionProcessor({'sample_rate': 16000})
+        pipeline = AudioPipeline([noise, normalizer])
+        stream = AudioStream(1600 * 8)
+        chunk = np.zeros(1600, dtype=np.int16).tobytes()
+        
+        for sample_rate, channels in ((8000, 1), (16000, 2)):
+            with pytest.raises(AudioProcessingError, match="process_into"):
+                pipeline.process_into(chunk, stream, sample_rate, channels)
+            assert stream.position == 0
+        
+        # 輸入已是目標格式時可正常處理
+        pipeline.process_into(chunk, stream, 16000, 1)
+        assert stream.position > 0
+    
+    def test_mixed_pipeline_forwards_array_output_format(self):
+        """測試混合管線中，陣列階段後的 bytes 處理器收到轉換後的格式"""
+        class RecordingPreprocessor(MockPreprocessor):
+            def process(self, audio_bytes, *, original_sample_rate=None, original_channels=None):
+                self.received = (original_sample_rate, original_channels)
+                return audio_bytes
+        
+        normalizer = AudioNormalizer({'target_sample_rate': 16000, 'target_channels': 1})
+        recorder = RecordingPreprocessor({'name': 'recorder'})
+        pipeline = AudioPipeline([normalizer, recorder])
+        
+        stereo = np.full((4800, 2), 1000, dtype=np.int16)
+        result = pipeline.process(stereo.tobytes(), original_sample_rate=48000, original_channels=2)
+        
+        assert recorder.received == (16000, 1)
+        assert len(result) == 1600 * 2
 
 
 class TestAudioPipelineManager:
@@ -139,6 +285,19 @@ class TestComponentRegistry:
         preprocessor = registry.create_preprocessor('mock', {'name': 'test'})
         assert isinstance(preprocessor, MockPreprocessor)
         assert preprocessor.name == 'test'
+    
+    def test_create_engine_cached(self):
+        """測試相同配置重複創建引擎時返回同一實例"""
+        registry = ComponentRegistry()
+        registry.register_engine('mock', MockEngine)
+        
+        config = {'model_size': 'base', 'options': {'beam_size': 5}}
+        engine1 = registry.create_engine('mock', config)
+        engine2 = registry.create_engine('mock', dict(config))
+        
+        assert engine1 is engine2
+        assert registry.create_engine('mock', {'model_size': 'tiny'}) is not engine1
+        assert registry.create_engine('mock', config, cached=False) is not engine1
 
 
 if __name__ == "__main__":
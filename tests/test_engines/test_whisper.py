@@ -1,12 +1,37 @@
 """測試 Whisper ASR 引擎"""
 
+import io
+import asyncio
+import threading
+import wave
 import pytest
 import numpy as np
+import torch
 from unittest.mock import Mock, patch, MagicMock
+from src.engines import whisper as whisper_module
 from src.engines.whisper import WhisperEngine
 from src.utils.exceptions import EngineInitializationError, TranscriptionError
 
 
+def make_wav_bytes(samples: np.ndarray, sample_rate: int, channels: int) -> bytes:
+    """產生 PCM16 WAV 格式的測試音訊"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def clear_model_cache():
+    """每個測試前清空模型快取，避免模擬模型互相干擾"""
+    whisper_module._MODEL_CACHE.clear()
+    yield
+    whisper_module._MODEL_CACHE.clear()
+
+
 class TestWhisperEngine:
     """測試 WhisperEngine 類"""
     
@@ -32,6 +57,55 @@ class TestWhisperEngine:
         assert not engine.supports_streaming
         mock_load_model.assert_called_once_with(name='base', device=None)
     
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_model_cache_shared(self, mock_load_model):
+        """測試相同配置的引擎共用已載入的模型"""
+        mock_load_model.return_value = Mock()
+        
+        engine1 = WhisperEngine(self.config)
+        engine2 = WhisperEngine(self.config)
+        
+        assert engine1.model is engine2.model
+        mock_load_model.assert_called_once()
+        
+        # 不同模型大小應重新載入
+        config = self.config.copy()
+        config['model_size'] = 'tiny'
+        WhisperEngine(config)
+        assert mock_load_model.call_count == 2
+    
+    @patch('src.engines.whisper.WhisperModel')
+    def test_faster_whisper_backend(self, mock_model_class):
+        """測試 faster_whisper 後端的初始化與轉譯"""
+        segment1, segment2 = Mock(), Mock()
+        segment1.text = ' Hello'
+        segment2.text = ' World'
+        mock_model = Mock()
+        mock_model.transcribe.return_value = (iter([segment1, segment2]), Mock())
+        mock_model_class.return_value = mock_model
+        
+        config = self.config.copy()
+        config.update({'backend': 'faster_whisper', 'device': 'cpu'})
+        engine = WhisperEngine(config)
+        
+        mock_model_class.assert_called_once_with('base', device='cpu', compute_type='int8')
+        
+        result = engine.transcribe(make_wav_bytes(np.zeros(1600), 16000, 1))
+        
+        assert result == "Hello World"
+        audio = mock_model.transcribe.call_args[0][0]
+        assert isinstance(audio, np.ndarray)
+        assert mock_model.transcribe.call_args[1]['language'] is None
+    
+    @patch('src.engines.whisper.WhisperModel', None)
+    def test_faster_whisper_backend_not_installed(self):
+        """測試未安裝 faster-whisper 時初始化失敗"""
+        config = self.config.copy()
+        config['backend'] = 'faster_whisper'
+        
+        with pytest.raises(EngineInitializationError):
+            WhisperEngine(config)
+    
     @patch('src.engines.whisper.whisper.load_model')
     def test_initialization_failure(self, mock_load_model):
         """測試初始化失敗"""
@@ -40,25 +114,26 @@ class TestWhisperEngine:
         with pytest.raises(EngineInitializationError):
             WhisperEngine(self.config)
     
+    @patch('src.engines.whisper.whisper.load_audio')
     @patch('src.engines.whisper.whisper.load_model')
-    @patch('src.engines.whisper.tempfile.NamedTemporaryFile')
-    @patch('src.engines.whisper.os.path.exists')
-    @patch('src.engines.whisper.os.unlink')
-    def test_transcribe_success(self, mock_unlink, mock_exists, mock_temp_file, mock_load_model):
-        """測試轉譯成功"""
+    def test_transcribe_success(self, mock_load_model, mock_load_audio):
+        """測試轉譯成功（非 WAV 格式經由暫存檔交給 ffmpeg 解碼，再以陣列推理）"""
         # 模擬模型
         mock_model = Mock()
         mock_model.transcribe.return_value = {'text': '  Hello World  '}
         mock_load_model.return_value = mock_model
         
-        # 模擬臨時檔案
-        mock_temp = Mock()
-        mock_temp.name = '/tmp/test.wav'
-        mock_temp.__enter__ = Mock(return_value=mock_temp)
-        mock_temp.__exit__ = Mock(return_value=None)
-        mock_temp_file.return_value = mock_temp
+        decoded = np.zeros(16000, dtype=np.float32)
+        temp_contents = []
+        
+        def fake_load_audio(path):
+            with open(path, 'rb') as f:
+                temp_contents.append((path, f.read()))
+            # 解碼期間持有暫存檔鎖
+            assert engine._tmp_lock.locked()
+            return decoded
         
-        mock_exists.return_value = True
+        mock_load_audio.side_effect = fake_load_audio
         
         engine = WhisperEngine(self.config)
         
@@ -66,9 +141,222 @@ class TestWhisperEngine:
         result = engine.transcribe(test_audio)
         
         assert result == "Hello World"
-        mock_temp.write.assert_called_once_with(test_audio)
         mock_model.transcribe.assert_called_once()
-        mock_unlink.assert_called_once()
+        
+        # 模型收到解碼後的陣列，推理時已釋放鎖
+        assert mock_model.transcribe.call_args[0][0] is decoded
+        assert not engine._tmp_lock.locked()
+        
+        # 暫存檔位於引擎專用目錄並重複使用
+        temp_path, content = temp_contents[0]
+        assert content == test_audio
+        
+        engine.transcribe(b"other_audio")
+        assert temp_contents[1] == (temp_path, b"other_audio")
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_transcribe_wav_in_memory(self, mock_load_model):
+        """測試 PCM16 WAV 直接在記憶體中解碼，不建立臨時檔案"""
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {'text': 'Hello'}
+        mock_load_model.return_value = mock_model
+        
+        engine = WhisperEngine(self.config)
+        
+        # 8 kHz 立體聲，應轉為 16 kHz 單聲道
+        stereo = np.full((800, 2), 16384, dtype=np.int16)
+        result = engine.transcribe(make_wav_bytes(stereo, 8000, 2))
+        
+        assert result == "Hello"
+        assert engine._tmpdir is None
+        audio = mock_model.transcribe.call_args[0][0]
+        assert isinstance(audio, np.ndarray)
+        assert audio.dtype == np.float32
+        assert audio.shape == (1600,)
+        assert np.allclose(audio[100:-100], 0.5, atol=1e-2)
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_fp16_default_follows_device(self, mock_load_model):
+        """測試 FP16 預設值：CUDA 啟用，CPU 停用，compute_type 可強制指定"""
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {'text': 'ok'}
+        mock_load_model.return_value = mock_model
+        audio = make_wav_bytes(np.zeros(1600), 16000, 1)
+        
+        engine = WhisperEngine(self.config)
+        
+        mock_model.device = 'cpu'
+        engine.transcribe(audio)
+        assert mock_model.transcribe.call_args[1]['fp16'] is False
+        
+        mock_model.device = 'cuda:0'
+        engine.transcribe(audio)
+        assert mock_model.transcribe.call_args[1]['fp16'] is True
+        
+        engine.compute_type = 'float32'
+        engine.transcribe(audio)
+        assert mock_model.transcribe.call_args[1]['fp16'] is False
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_transcribe_streaming_fallback(self, mock_load_model):
+        """測試串流後備方案：收集全部音訊後一次轉譯"""
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {'text': 'done'}
+        mock_load_model.return_value = mock_model
+        engine = WhisperEngine(self.config)
+        
+        wav_bytes = make_wav_bytes(np.zeros(1600), 16000, 1)
+        
+        async def audio_stream():
+            for i in range(0, len(wav_bytes), 1000):
+                yield wav_bytes[i:i + 1000]
+        
+        async def collect():
+            return [text async for text in engine.transcribe_streaming(audio_stream())]
+        
+        assert asyncio.run(collect()) == ['done']
+        mock_model.transcribe.assert_called_once()
+        assert len(mock_model.transcribe.call_args[0][0]) == 1600
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_transcribe_streaming_windows(self, mock_load_model):
+        """測試設定 stream_window_seconds 時依視窗分段轉譯"""
+        mock_model = Mock()
+        mock_model.transcribe.side_effect = [{'text': 'first'}, {'text': 'second'}]
+        mock_load_model.return_value = mock_model
+        
+        config = self.config.copy()
+        config['stream_window_seconds'] = 0.05  # 800 個樣本 = 1600 bytes
+        engine = WhisperEngine(config)
+        
+        async def audio_stream():
+            for _ in range(3):
+                yield np.zeros(500, dtype=np.int16).tobytes()
+        
+        async def collect():
+            return [text async for text in engine.transcribe_streaming(audio_stream())]
+        
+        assert asyncio.run(collect()) == ['first', 'second']
+        lengths = [len(call[0][0]) for call in mock_model.transcribe.call_args_list]
+        assert lengths == [800, 700]
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_transcribe_batch(self, mock_load_model):
+        """測試批次轉譯以單次解碼器呼叫完成"""
+        mock_model = Mock()
+        mock_model.device = 'cpu'
+        mock_model.dims.n_mels = 80
+        mock_model.decode.return_value = [Mock(text=' one '), Mock(text=' two ')]
+        mock_load_model.return_value = mock_model
+        
+        engine = WhisperEngine(self.config)
+        audios = [make_wav_bytes(np.zeros(1600), 16000, 1),
+                  make_wav_bytes(np.zeros(3200), 16000, 1)]
+        
+        assert engine.transcribe_batch(audios) == ['one', 'two']
+        mock_model.decode.assert_called_once()
+        
+        # 兩段音訊補齊到相同長度後堆疊成一個批次
+        mel = mock_model.decode.call_args[0][0]
+        assert tuple(mel.shape) == (2, 80, 3000)
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    def test_transcribe_batch_mel_matches_single_clip(self, mock_load_model):
+        """測試批次中每段音訊的 Mel 頻譜與單獨計算時相同（不受同批次其他音訊音量影響）"""
+        mock_model = Mock()
+        mock_model.device = 'cpu'
+        mock_model.dims.n_mels = 80
+        mock_model.decode.return_value = [Mock(text='quiet'), Mock(text='loud')]
+        mock_load_model.return_value = mock_model
+        
+        engine = WhisperEngine(self.config)
+        t = np.arange(16000) / 16000
+        quiet = np.sin(2 * np.pi * 440 * t) * 30
+        loud = np.sin(2 * np.pi * 440 * t) * 30000
+        
+        engine.transcribe_batch([make_wav_bytes(quiet, 16000, 1), make_wav_bytes(loud, 16000, 1)])
+        
+        mel = mock_model.decode.call_args[0][0]
+        for i, samples in enumerate((quiet, loud)):
+            audio = whisper_module.whisper.pad_or_trim(engine._bytes_to_float32(make_wav_bytes(samples, 16000, 1)))
+            expected = whisper_module.whisper.log_mel_spectrogram(torch.from_numpy(audio), n_mels=80)
+            assert torch.equal(mel[i], expected)
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    @patch.object(WhisperEngine, 'transcribe_batch')
+    def test_transcribe_async_micro_batch(self, mock_transcribe_batch, mock_load_model):
+        """測試並行的非同步請求被合併為一次批次推論"""
+        mock_load_model.return_value = Mock()
+        mock_transcribe_batch.side_effect = lambda audios, **kwargs: [a.decode() for a in audios]
+        
+        config = self.config.copy()
+        config['batch_window_ms'] = 10
+        engine = WhisperEngine(config)
+        
+        async def run():
+            return await asyncio.gather(engine.transcribe_async(b"a"), engine.transcribe_async(b"b"))
+        
+        assert asyncio.run(run()) == ['a', 'b']
+        mock_transcribe_batch.assert_called_once_with([b"a", b"b"])
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    @patch.object(WhisperEngine, 'transcribe_batch')
+    def test_transcribe_async_unhashable_options(self, mock_transcribe_batch, mock_load_model):
+        """測試不可雜湊的轉譯參數（如 list）可以合併批次，並原樣傳給 transcribe_batch"""
+        mock_load_model.return_value = Mock()
+        mock_transcribe_batch.side_effect = lambda audios, **kwargs: [a.decode() for a in audios]
+        
+        config = self.config.copy()
+        config['batch_window_ms'] = 10
+        engine = WhisperEngine(config)
+        
+        async def run():
+            return await asyncio.gather(
+                engine.transcribe_async(b"a", temperature=[0.0, 0.2]),
+                engine.transcribe_async(b"b", temperature=[0.0, 0.2]),
+            )
+        
+        assert asyncio.run(run()) == ['a', 'b']
+        mock_transcribe_batch.assert_called_once_with([b"a", b"b"], temperature=[0.0, 0.2])
+        assert engine._pending_batches == {}
+    
+    @patch('src.engines.whisper.whisper.load_model')
+    @patch.object(WhisperEngine, 'transcribe_batch')
+    def test_transcribe_async_batches_per_event_loop(self, mock_transcribe_batch, mock_load_model):
+        """測試不同執行緒的事件迴圈各自成批，不會混入其他迴圈的請求"""
+        mock_load_model.return_value = Mock()
+        batches = []
+        
+        def fake_batch(audios, **kwargs):
+            batches.append(list(audios))
+            return [a.decode() for a in audios]
+        
+        mock_transcribe_batch.side_effect = fake_batch
+        
+        config = self.config.copy()
+        config['batch_window_ms'] = 50
+        engine = WhisperEngine(config)
+        barrier = threading.Barrier(2)
+        results = {}
+        
+        def worker(name):
+            async def run():
+                barrier.wait()
+                requests = asyncio.gather(*(engine.transcribe_async(f"{name}{i}".encode()) for i in range(2)))
+                return await asyncio.wait_for(requests, timeout=5)
+            try:
+                results[name] = asyncio.run(run())
+            except Exception as e:
+                results[name] = e
+        
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ('x', 'y')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        
+        assert results == {'x': ['x0', 'x1'], 'y': ['y0', 'y1']}
+        assert sorted(batches) == [[b"x0", b"x1"], [b"y0", b"y1"]]
     
     @patch('src.engines.whisper.whisper.load_model')
     def test_transcribe_without_model(self, mock_load_model):
@@ -81,12 +369,11 @@ class TestWhisperEngine:
             engine.transcribe(b"test_audio")
     
     @patch('src.engines.whisper.whisper.load_model')
-    @patch('src.engines.whisper.tempfile.NamedTemporaryFile')
     @patch('src.engines.whisper.whisper.load_audio')
     @patch('src.engines.whisper.whisper.pad_or_trim')
     @patch('src.engines.whisper.whisper.log_mel_spectrogram')
     def test_detect_language(self, mock_log_mel, mock_pad_trim, mock_load_audio, 
-                           mock_temp_file, mock_load_model):
+                           mock_load_model):
         """測試語言偵測"""
         # 模擬模型
         mock_model = Mock()
@@ -96,12 +383,6 @@ class TestWhisperEngine:
         mock_load_model.return_value = mock_model
         
         # 模擬其他組件
-        mock_temp = Mock()
-        mock_temp.name = '/tmp/test.wav'
-        mock_temp.__enter__ = Mock(return_value=mock_temp)
-        mock_temp.__exit__ = Mock(return_value=None)
-        mock_temp_file.return_value = mock_temp
-        
         mock_audio = np.array([1, 2, 3])
         mock_load_audio.return_value = mock_audio
         mock_pad_trim.return_value = mock_audio
@@ -2,52 +2,110 @@
 
 import pytest
 import numpy as np
+from src.core.pipeline import AudioPipeline
 from src.preprocessors.noise_reduction import NoiseReductionProcessor, AudioNormalizer
-from src.utils.audio import bytes_to_numpy, numpy_to_bytes
+from src.utils.audio import bytes_to_numpy, numpy_to_bytes, float32_to_int16
 from src.utils.exceptions import AudioProcessingError
 
 
+# 固定種子的隨機數產生器，讓加噪測試可重現
+RNG = np.random.default_rng(12345)
+
+
+def make_tone_cache():
+    """建立正弦波測試信號的產生器，相同參數的信號只合成一次
+    
+    以旋轉相量的累乘取代逐樣本的 sin 計算。
+    """
+    cache = {}
+    
+    def tone(freq: float, sample_rate: int, duration: float) -> np.ndarray:
+        key = (freq, sample_rate, duration)
+        if key not in cache:
+            phasor = np.full(int(sample_rate * duration), np.exp(2j * np.pi * freq / sample_rate), dtype=np.complex64)
+            phasor[0] = 1.0
+            cache[key] = np.cumprod(phasor).imag.astype(np.float32)
+            cache[key].setflags(write=False)
+        return cache[key]
+    
+    return tone
+
+
+@pytest.fixture(scope="module")
+def tone_cache():
+    """模組共用的正弦波測試信號"""
+    return make_tone_cache()
+
+
+NOISE_CONFIG = {
+    'enabled': True,
+    'strength': 0.5,
+    'sample_rate': 16000,
+    'frame_length': 2048,
+    'hop_length': 512
+}
+
+NORMALIZER_CONFIG = {
+    'target_sample_rate': 16000,
+    'target_channels': 1,
+    'normalize_volume': True,
+    'target_volume': 0.8
+}
+
+
+@pytest.fixture(scope="module")
+def noise_config():
+    """降噪處理器的基本配置（共用，測試中需修改時請先複製）"""
+    return NOISE_CONFIG
+
+
+@pytest.fixture(scope="module")
+def noise_processor(noise_config):
+    """模組共用的降噪處理器，初始化的預先計算只做一次"""
+    return NoiseReductionProcessor(noise_config)
+
+
+@pytest.fixture(scope="module")
+def normalizer_config():
+    """標準化處理器的基本配置（共用，測試中需修改時請先複製）"""
+    return NORMALIZER_CONFIG
+
+
+@pytest.fixture(scope="module")
+def normalizer(normalizer_config):
+    """模組共用的標準化處理器"""
+    return AudioNormalizer(normalizer_config)
+
+
 class TestNoiseReductionProcessor:
     """測試 NoiseReductionProcessor 類"""
     
-    def setup_method(self):
-        """設置測試"""
-        self.config = {
-            'enabled': True,
-            'strength': 0.5,
-            'sample_rate': 16000,
-            'frame_length': 2048,
-            'hop_length': 512
-        }
-    
-    def test_initialization_success(self):
+    def test_initialization_success(self, noise_processor):
         """測試成功初始化"""
-        processor = NoiseReductionProcessor(self.config)
-        
-        assert processor.name == "noise_reduction"
-        assert processor.enabled == True
-        assert processor.strength == 0.5
-        assert processor.sample_rate == 16000
+        assert noise_processor.name == "noise_reduction"
+        assert noise_processor.enabled == True
+        assert noise_processor.strength == 0.5
+        assert noise_processor.sample_rate == 16000
     
-    def test_initialization_invalid_strength(self):
+    def test_initialization_invalid_strength(self, noise_config):
         """測試無效強度參數"""
-        config = self.config.copy()
+        config = noise_config.copy()
         config['strength'] = 1.5  # 超出範圍
         
         with pytest.raises(AudioProcessingError):
             NoiseReductionProcessor(config)
     
-    def test_initialization_invalid_sample_rate(self):
+    def test_initialization_invalid_sample_rate(self, noise_config):
         """測試無效採樣率"""
-        config = self.config.copy()
+        config = noise_config.copy()
         config['sample_rate'] = -1
         
         with pytest.raises(AudioProcessingError):
             NoiseReductionProcessor(config)
     
-    def test_process_disabled(self):
+    def test_process_disabled(self, noise_config):
         """測試停用時直接返回原始音訊"""
-        config = self.config.copy()
+        config = noise_config.copy()
         config['enabled'] = False
         
         processor = NoiseReductionProcessor(config)
@@ -55,31 +113,33 @@ class TestNoiseReductionProcessor:
         
         result = processor.process(test_audio, original_sample_rate=16000, original_channels=1)
         assert result == test_audio
+        
+        # memoryview 輸入也返回 bytes
+        result = processor.process(memoryview(test_audio), original_sample_rate=16000, original_channels=1)
+        assert isinstance(result, bytes)
+        assert result == test_audio
     
-    def test_process_with_noise_reduction(self):
+    def test_process_with_noise_reduction(self, noise_processor, tone_cache):
         """測試降噪處理功能"""
-        processor = NoiseReductionProcessor(self.config)
-        
         # 創建測試音訊：正弦波 + 噪音
         duration = 0.5  # 0.5 秒
         sample_rate = 16000
-        t = np.linspace(0, duration, int(sample_rate * duration))
         
         # 純正弦波信號
-        clean_signal = np.sin(2 * np.pi * 440 * t)  # 440Hz
+        clean_signal = tone_cache(440, sample_rate, duration)  # 440Hz
         
         # 添加噪音
-        noise = np.random.normal(0, 0.1, len(clean_signal))
+        noise = RNG.standard_normal(len(clean_signal), dtype=np.float32) * np.float32(0.1)
         noisy_signal = clean_signal + noise
         
         # 轉換為 int16 並轉為 bytes
-        noisy_signal_int16 = (noisy_signal * 32767).astype(np.int16)
-        audio_bytes = noisy_signal_int16.tobytes()
+        noisy_signal_int16 = float32_to_int16(noisy_signal, scale=32767)
+        audio_bytes = memoryview(noisy_signal_int16)
         
         # 處理音訊
-        result_bytes = processor.process(audio_bytes, 
-                                       original_sample_rate=sample_rate, 
-                                       original_channels=1)
+        result_bytes = noise_processor.process(audio_bytes, 
+                                             original_sample_rate=sample_rate, 
+                                             original_channels=1)
         
         # 驗證結果
         assert isinstance(result_bytes, bytes)
@@ -89,15 +149,13 @@ class TestNoiseReductionProcessor:
         result_array, _, _ = bytes_to_numpy(result_bytes, sample_rate, 1)
         assert len(result_array) == len(noisy_signal_int16)
     
-    def test_create_soft_mask(self):
+    def test_create_soft_mask(self, noise_processor):
         """測試軟遮罩創建"""
-        processor = NoiseReductionProcessor(self.config)
-        
         # 測試能量和閾值
         energy = np.array([0.1, 0.5, 1.0, 2.0, 0.3])
         threshold = 0.8
         
-        mask = processor._create_soft_mask(energy, threshold)
+        mask = noise_processor._create_soft_mask(energy, threshold)
         
         assert len(mask) == len(energy)
         assert np.all(mask >= 0.1)  # 最小值應該是 0.1
@@ -106,10 +164,21 @@ class TestNoiseReductionProcessor:
         # 高能量部分應該有較高的遮罩值
         assert mask[3] > mask[0]  # energy[3]=2.0 > energy[0]=0.1
     
-    def test_process_with_parameters(self):
-        """測試帶參數的處理功能"""
-        processor = NoiseReductionProcessor(self.config)
+    def test_soft_mask_kernel_matches_lookup_table(self, noise_processor, monkeypatch):
+        """測試 numba 軟遮罩與查表路徑的結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA:
+            pytest.skip("numba 未安裝")
+        
+        energy = np.linspace(0.0, 3.0, 1000, dtype=np.float32)
+        
+        mask = noise_processor._create_soft_mask(energy, 0.8).copy()
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', False)
         
+        np.testing.assert_allclose(mask, noise_processor._create_soft_mask(energy, 0.8), atol=1e-3)
+    
+    def test_process_with_parameters(self, noise_processor, tone_cache):
+        """測試帶參數的處理功能"""
         # 創建測試音訊（立體聲）
         duration = 0.1
         sample_rate = 48000  # 不同採樣率
@@ -117,19 +186,20 @@ class TestNoiseReductionProcessor:
         samples_per_channel = int(sample_rate * duration)
         
         # 創建立體聲信號
-        t = np.linspace(0, duration, samples_per_channel)
-        left_channel = np.sin(2 * np.pi * 440 * t)
-        right_channel = np.sin(2 * np.pi * 880 * t)
+        left_channel = tone_cache(440, sample_rate, duration)
+        right_channel = tone_cache(880, sample_rate, duration)
         
-        # 組合為立體聲
-        stereo_signal = np.column_stack([left_channel, right_channel])
-        stereo_int16 = (stereo_signal * 16000).astype(np.int16)
-        audio_bytes = stereo_int16.tobytes()
+        # 組合為立體聲（直接寫入交錯排列的緩衝區）
+        stereo_signal = np.empty((samples_per_channel, 2), dtype=np.float32)
+        stereo_signal[:, 0] = left_channel
+        stereo_signal[:, 1] = right_channel
+        stereo_int16 = float32_to_int16(stereo_signal, scale=16000)
+        audio_bytes = memoryview(stereo_int16)
         
         # 處理
-        result_bytes = processor.process(audio_bytes, 
-                                       original_sample_rate=sample_rate, 
-                                       original_channels=channels)
+        result_bytes = noise_processor.process(audio_bytes, 
+                                             original_sample_rate=sample_rate, 
+                                             original_channels=channels)
         
         # 驗證結果
         assert isinstance(result_bytes, bytes)
@@ -139,28 +209,231 @@ class TestNoiseReductionProcessor:
         result_array, _, _ = bytes_to_numpy(result_bytes, sample_rate, channels)
         assert result_array.shape == stereo_int16.shape
     
-    def test_process_without_parameters(self):
-        """測試不提供參數時的處理（應該使用預設值）"""
-        processor = NoiseReductionProcessor(self.config)
+    def test_process_array(self, noise_processor, tone_cache):
+        """測試直接處理 float32 陣列"""
+        stereo = np.empty((1600, 2), dtype=np.float32)
+        np.multiply(tone_cache(440, 16000, 0.1)[:, None], np.float32(0.5), out=stereo)
+        
+        result, sample_rate = noise_processor.process_array(stereo, 16000)
+        
+        assert noise_processor.supports_array
+        assert sample_rate == 16000
+        assert result.shape == stereo.shape
+        assert np.max(np.abs(result)) <= 1.0
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_process_array_per_channel(self, noise_config, monkeypatch, tone_cache, use_numba):
+        """測試 per_channel 模式下各聲道獨立降噪（無 numba 時在執行緒池中處理）"""
+        import src.preprocessors.noise_reduction as nr_module
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', nr_module.HAS_NUMBA and use_numba)
+        processor = NoiseReductionProcessor({**noise_config, 'per_channel': True})
+        
+        left = tone_cache(440, 16000, 0.1) * np.float32(0.5)
+        right = tone_cache(880, 16000, 0.1) * np.float32(0.2)
+        stereo = np.empty((len(left), 2), dtype=np.float32)
+        stereo[:, 0] = left
+        stereo[:, 1] = right
+        
+        result, _ = processor.process_array(stereo, 16000)
+        
+        assert result.shape == stereo.shape
+        np.testing.assert_allclose(result[:, 0], processor._apply_noise_reduction(left), rtol=1e-6)
+        np.testing.assert_allclose(result[:, 1], processor._apply_noise_reduction(right), rtol=1e-6)
+    
+    def test_channel_pool_lifecycle(self, noise_config):
+        """測試聲道數增加時重建執行緒池，close 與回收處理器時關閉執行緒池"""
+        import gc
+        processor = NoiseReductionProcessor({**noise_config, 'per_channel': True})
+        
+        pool = processor._channel_pool(2)
+        assert processor._channel_pool(2) is pool
+        
+        larger = processor._channel_pool(4)
+        assert larger is not pool
+        with pytest.raises(RuntimeError):
+            pool.submit(int)
+        
+        processor.close()
+        with pytest.raises(RuntimeError):
+            larger.submit(int)
+        assert processor._pool is None
+        
+        pool = processor._channel_pool(2)
+        del processor
+        gc.collect()
+        with pytest.raises(RuntimeError):
+            pool.submit(int)
+    
+    def test_fused_kernel_matches_numpy(self, noise_processor, monkeypatch):
+        """測試融合 kernel 與 numpy 路徑的結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA:
+            pytest.skip("numba 未安裝")
+        
+        rng = np.random.default_rng(0)
+        audio = (0.3 * rng.standard_normal(16000)).astype(np.float32)
+        
+        fused = noise_processor._apply_noise_reduction(audio)
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', False)
+        reference = noise_processor._apply_noise_reduction(audio)
+        
+        # numpy 路徑以 sigmoid 查表近似（比值解析度 1/1024）
+        np.testing.assert_allclose(fused, reference, atol=1e-3)
+    
+    def test_gate_smooth_kernel(self, noise_processor):
+        """測試合併 kernel 與「軟閾值 kernel + uniform_filter1d」結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA or nr_module.uniform_filter1d is None:
+            pytest.skip("numba 或 scipy 未安裝")
+        
+        window_size = noise_processor._window_size
+        for strength in (0.5, 0.8):
+            audio = RNG.standard_normal(16000, dtype=np.float32) * np.float32(0.3)
+            result = nr_module._gate_smooth_kernel(audio, strength, window_size, 1600,
+                                                   np.empty_like(audio), np.empty_like(audio))
+            
+            threshold = noise_processor._mean_abs(audio[:1600]) * (1 + strength)
+            reference = nr_module._soft_gate_kernel(audio, threshold, np.empty_like(audio))
+            reference = nr_module.uniform_filter1d(reference, size=window_size, mode='nearest')
+            
+            np.testing.assert_allclose(result, reference, atol=1e-6)
+    
+    def test_gate_smooth_kernel_short_signal(self, noise_processor):
+        """測試短於噪音取樣段的信號以整段平均估計噪音，且不做平滑"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA:
+            pytest.skip("numba 未安裝")
+        
+        audio = RNG.standard_normal(8, dtype=np.float32)
+        result = nr_module._gate_smooth_kernel(audio, 0.5, noise_processor._window_size, 0,
+                                               np.empty_like(audio), np.empty_like(audio))
         
+        threshold = noise_processor._mean_abs(audio) * 0.1 * 1.5
+        reference = nr_module._soft_gate_kernel(audio, threshold, np.empty_like(audio))
+        
+        np.testing.assert_allclose(result, reference, atol=1e-6)
+    
+    def test_iir_smoothing(self, noise_config, monkeypatch):
+        """測試 IIR 平滑模式在 numba 與 scipy 路徑的結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA or nr_module.lfilter is None:
+            pytest.skip("numba 或 scipy 未安裝")
+        
+        processor = NoiseReductionProcessor({**noise_config, 'smoothing': 'iir'})
+        audio = np.array([1.0, 1.0, 10.0, 1.0, 1.0] * 100, dtype=np.float32)
+        
+        smoothed = processor._apply_smoothing(audio)
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', False)
+        reference = processor._apply_smoothing(audio)
+        
+        assert smoothed.shape == audio.shape
+        assert np.max(smoothed) < np.max(audio)
+        np.testing.assert_allclose(smoothed, reference, rtol=1e-5)
+    
+    def test_cumsum_smoothing_matches_uniform_filter(self, noise_processor, monkeypatch):
+        """測試無 scipy 時的累積和移動平均與 uniform_filter1d 結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        if nr_module.uniform_filter1d is None:
+            pytest.skip("scipy 未安裝")
+        
+        audio = np.array([1.0, 1.0, 10.0, 1.0, 1.0] * 100)
+        
+        reference = noise_processor._apply_smoothing(audio)
+        monkeypatch.setattr(nr_module, 'uniform_filter1d', None)
+        smoothed = noise_processor._apply_smoothing(audio)
+        
+        assert smoothed.dtype == np.float32
+        np.testing.assert_allclose(smoothed, reference, rtol=1e-6)
+    
+    def test_negligible_strength_bypass(self, noise_config):
+        """測試強度趨近 0 時直接返回原始音訊"""
+        processor = NoiseReductionProcessor({**noise_config, 'strength': 0.0})
+        audio_bytes = (np.arange(1600) % 200 - 100).astype(np.int16).tobytes()
+        
+        assert processor.process(audio_bytes, original_sample_rate=16000, original_channels=1) is audio_bytes
+    
+    def test_invalid_smoothing_mode(self, noise_config):
+        """測試無效的平滑模式"""
+        with pytest.raises(AudioProcessingError):
+            NoiseReductionProcessor({**noise_config, 'smoothing': 'median'})
+    
+    def test_invalid_method(self, noise_config):
+        """測試無效的降噪方法與幀參數"""
+        with pytest.raises(AudioProcessingError):
+            NoiseReductionProcessor({**noise_config, 'method': 'wiener'})
+        with pytest.raises(AudioProcessingError):
+            NoiseReductionProcessor({**noise_config, 'method': 'spectral', 'hop_length': 4096})
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_spectral_gating(self, noise_config, monkeypatch, tone_cache, use_numba):
+        """測試頻域降噪：前段靜音時完整重建信號，前段為噪音時壓低噪音"""
+        import src.preprocessors.noise_reduction as nr_module
+        if nr_module.rfft is None:
+            pytest.skip("scipy 未安裝")
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', nr_module.HAS_NUMBA and use_numba)
+        processor = NoiseReductionProcessor({**noise_config, 'method': 'spectral'})
+        
+        clean = tone_cache(440, 16000, 1.0) * np.float32(0.5)
+        clean[:4000] = 0.0
+        
+        result = processor._apply_noise_reduction(clean)
+        
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, clean, atol=1e-5)
+        
+        noise = RNG.standard_normal(len(clean), dtype=np.float32) * np.float32(0.05)
+        denoised = processor._apply_noise_reduction(clean + noise)
+        
+        assert np.mean(np.abs(denoised[:3000])) < 0.7 * np.mean(np.abs(noise[:3000]))
+    
+    @pytest.mark.parametrize("hop_length", [128, 256, 300])
+    def test_window_normalizer_bounded_cache(self, noise_config, hop_length):
+        """測試窗平方和倒數與直接計算完全相同，且快取不隨輸入長度增加"""
+        processor = NoiseReductionProcessor({**noise_config, 'method': 'spectral', 'hop_length': hop_length})
+        window = processor._hann(processor.frame_length)
+        
+        for frames in (1, 3, 5, 8, 9, 50, 123):
+            normalizer = processor._window_normalizer(window, hop_length, frames)
+            expected = processor._window_square_sum(window, hop_length, frames)
+            np.testing.assert_array_equal(normalizer, expected)
+        
+        assert sum(key[0] == 'stft_window_edges' for key in processor._cache) == 1
+    
+    def test_spectral_numexpr_matches_numba(self, noise_config, monkeypatch):
+        """測試頻域遮罩的 numexpr 路徑與 numba kernel 結果一致"""
+        import src.preprocessors.noise_reduction as nr_module
+        pytest.importorskip("numexpr")
+        if not nr_module.HAS_NUMBA or nr_module.rfft is None:
+            pytest.skip("numba 或 scipy 未安裝")
+        
+        processor = NoiseReductionProcessor({**noise_config, 'method': 'spectral'})
+        audio = RNG.standard_normal(16000, dtype=np.float32) * np.float32(0.3)
+        
+        fused = processor._apply_noise_reduction(audio)
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', False)
+        
+        np.testing.assert_allclose(processor._apply_noise_reduction(audio), fused, atol=1e-5)
+    
+    def test_process_without_parameters(self, noise_processor, tone_cache):
+        """測試不提供參數時的處理（應該使用預設值）"""
         # 創建簡單測試音訊
-        test_signal = np.sin(2 * np.pi * 440 * np.linspace(0, 0.1, 1600))
-        test_int16 = (test_signal * 16000).astype(np.int16)
-        audio_bytes = test_int16.tobytes()
+        test_signal = tone_cache(440, 16000, 0.1)
+        test_int16 = float32_to_int16(test_signal, scale=16000)
+        audio_bytes = memoryview(test_int16)
         
         # 不傳遞參數的處理
-        result_bytes = processor.process(audio_bytes)
+        result_bytes = noise_processor.process(audio_bytes)
         
         # 應該正常處理
         assert isinstance(result_bytes, bytes)
         assert len(result_bytes) > 0
+    
+    def test_apply_smoothing(self, noise_processor):
         """測試平滑處理"""
-        processor = NoiseReductionProcessor(self.config)
-        
         # 創建有尖峰的信號
         audio_array = np.array([1.0, 1.0, 10.0, 1.0, 1.0] * 100)
         
-        smoothed = processor._apply_smoothing(audio_array)
+        smoothed = noise_processor._apply_smoothing(audio_array)
         
         assert len(smoothed) == len(audio_array)
         # 尖峰應該被平滑
@@ -172,62 +445,48 @@ class TestNoiseReductionProcessor:
 class TestAudioNormalizer:
     """測試 AudioNormalizer 類"""
     
-    def setup_method(self):
-        """設置測試"""
-        self.config = {
-            'target_sample_rate': 16000,
-            'target_channels': 1,
-            'normalize_volume': True,
-            'target_volume': 0.8
-        }
-    
-    def test_initialization_success(self):
+    def test_initialization_success(self, normalizer):
         """測試成功初始化"""
-        normalizer = AudioNormalizer(self.config)
-        
         assert normalizer.name == "audio_normalizer"
         assert normalizer.target_sample_rate == 16000
         assert normalizer.target_channels == 1
         assert normalizer.normalize_volume == True
         assert normalizer.target_volume == 0.8
     
-    def test_initialization_invalid_sample_rate(self):
+    def test_initialization_invalid_sample_rate(self, normalizer_config):
         """測試無效採樣率"""
-        config = self.config.copy()
+        config = normalizer_config.copy()
         config['target_sample_rate'] = 0
         
         with pytest.raises(AudioProcessingError):
             AudioNormalizer(config)
     
-    def test_initialization_invalid_channels(self):
+    def test_initialization_invalid_channels(self, normalizer_config):
         """測試無效聲道數"""
-        config = self.config.copy()
+        config = normalizer_config.copy()
         config['target_channels'] = 3  # 不支援
         
         with pytest.raises(AudioProcessingError):
             AudioNormalizer(config)
     
-    def test_initialization_invalid_volume(self):
+    def test_initialization_invalid_volume(self, normalizer_config):
         """測試無效目標音量"""
-        config = self.config.copy()
+        config = normalizer_config.copy()
         config['target_volume'] = 1.5  # 超出範圍
         
         with pytest.raises(AudioProcessingError):
             AudioNormalizer(config)
     
-    def test_process_normalization(self):
+    def test_process_normalization(self, normalizer, tone_cache):
         """測試標準化處理"""
-        normalizer = AudioNormalizer(self.config)
-        
         # 創建測試音訊
         duration = 0.1
         original_sample_rate = 8000  # 與目標不同
-        t = np.linspace(0, duration, int(original_sample_rate * duration))
-        signal = np.sin(2 * np.pi * 440 * t)
+        signal = tone_cache(440, original_sample_rate, duration)
         
         # 轉換為 int16
-        signal_int16 = (signal * 16000).astype(np.int16)  # 較低音量
-        audio_bytes = signal_int16.tobytes()
+        signal_int16 = float32_to_int16(signal, scale=16000)  # 較低音量
+        audio_bytes = memoryview(signal_int16)
         
         # 處理 - 傳遞原始參數
         result_bytes = normalizer.process(audio_bytes, 
@@ -246,19 +505,19 @@ class TestAudioNormalizer:
         result_max = np.max(np.abs(result_array))
         assert result_max > original_max
     
-    def test_process_no_conversion_needed(self):
+    def test_process_no_conversion_needed(self, normalizer_config, tone_cache):
         """測試不需要轉換時的處理"""
         # 配置目標格式與原始格式相同
-        config = self.config.copy()
+        config = normalizer_config.copy()
         config['target_sample_rate'] = 16000
         config['target_channels'] = 1
         
         normalizer = AudioNormalizer(config)
         
         # 創建測試音訊
-        test_signal = np.sin(2 * np.pi * 440 * np.linspace(0, 0.1, 1600))
-        test_int16 = (test_signal * 16000).astype(np.int16)
-        audio_bytes = test_int16.tobytes()
+        test_signal = tone_cache(440, 16000, 0.1)
+        test_int16 = float32_to_int16(test_signal, scale=16000)
+        audio_bytes = memoryview(test_int16)
         
         # 處理（格式相同，只做音量標準化）
         result_bytes = normalizer.process(audio_bytes, 
@@ -269,14 +528,39 @@ class TestAudioNormalizer:
         assert isinstance(result_bytes, bytes)
         assert len(result_bytes) > 0
     
-    def test_process_without_original_params(self):
-        """測試不提供原始參數時的處理"""
-        normalizer = AudioNormalizer(self.config)
+    def test_process_passthrough_returns_bytes(self, normalizer_config):
+        """測試停用音量標準化且格式相同時，memoryview 輸入仍返回 bytes"""
+        config = {**normalizer_config, 'target_sample_rate': 16000, 'target_channels': 1,
+                  'normalize_volume': False}
+        normalizer = AudioNormalizer(config)
+        audio_bytes = memoryview(np.arange(160, dtype=np.int16))
+        
+        for kwargs in ({}, {'original_sample_rate': 16000, 'original_channels': 1}):
+            result = normalizer.process(audio_bytes, **kwargs)
+            assert isinstance(result, bytes)
+            assert result == audio_bytes.tobytes()
+    
+    def test_peak_normalize_kernel_matches_numpy(self, normalizer, monkeypatch):
+        """測試 numba 定點峰值標準化 kernel 與 numpy 浮點路徑相差不超過 1 LSB"""
+        import src.preprocessors.noise_reduction as nr_module
+        if not nr_module.HAS_NUMBA:
+            pytest.skip("numba 未安裝")
         
+        rng = np.random.default_rng(0)
+        audio_bytes = rng.integers(-12000, 12000, size=1600).astype(np.int16).tobytes()
+        
+        fixed_point = np.frombuffer(normalizer._normalize_volume(audio_bytes), dtype=np.int16)
+        monkeypatch.setattr(nr_module, 'HAS_NUMBA', False)
+        reference = np.frombuffer(normalizer._normalize_volume(audio_bytes), dtype=np.int16)
+        
+        assert np.max(np.abs(fixed_point.astype(np.int32) - reference)) <= 1
+    
+    def test_process_without_original_params(self, normalizer, tone_cache):
+        """測試不提供原始參數時的處理"""
         # 創建測試音訊
-        test_signal = np.sin(2 * np.pi * 440 * np.linspace(0, 0.1, 1600))
-        test_int16 = (test_signal * 16000).astype(np.int16)
-        audio_bytes = test_int16.tobytes()
+        test_signal = tone_cache(440, 16000, 0.1)
+        test_int16 = float32_to_int16(test_signal, scale=16000)
+        audio_bytes = memoryview(test_int16)
         
         # 不提供原始參數（應該只做音量標準化）
         result_bytes = normalizer.process(audio_bytes)
@@ -284,12 +568,12 @@ class TestAudioNormalizer:
         # 應該有結果
         assert isinstance(result_bytes, bytes)
         assert len(result_bytes) > 0
+    
+    def test_normalize_zero_signal(self, normalizer):
         """測試零信號的音量標準化"""
-        normalizer = AudioNormalizer(self.config)
-        
         # 創建零信號
         zero_signal = np.zeros(1000, dtype=np.int16)
-        audio_bytes = zero_signal.tobytes()
+        audio_bytes = memoryview(zero_signal)
         
         # 處理（不應該出錯）
         result_bytes = normalizer._normalize_volume(audio_bytes)
@@ -302,7 +586,7 @@ class TestAudioNormalizer:
 class TestPreprocessorIntegration:
     """前處理器整合測試"""
     
-    def test_noise_reduction_and_normalization_pipeline(self):
+    def test_noise_reduction_and_normalization_pipeline(self, tone_cache):
         """測試降噪和標準化管線"""
         # 創建處理器
         noise_config = {
@@ -323,20 +607,17 @@ class TestPreprocessorIntegration:
         # 創建測試音訊
         duration = 0.2
         sample_rate = 16000
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        clean_signal = np.sin(2 * np.pi * 440 * t)
-        noise = np.random.normal(0, 0.2, len(clean_signal))
+        clean_signal = tone_cache(440, sample_rate, duration)
+        noise = RNG.standard_normal(len(clean_signal), dtype=np.float32) * np.float32(0.2)
         noisy_signal = clean_signal + noise
         
         # 轉換為 bytes
-        noisy_signal_int16 = (noisy_signal * 16000).astype(np.int16)
-        audio_bytes = noisy_signal_int16.tobytes()
+        noisy_signal_int16 = float32_to_int16(noisy_signal, scale=16000)
+        audio_bytes = memoryview(noisy_signal_int16)
         
-        # 依序處理 - 傳遞正確的原始參數
-        step1_result = noise_processor.process(audio_bytes, 
-                                             original_sample_rate=sample_rate, 
-                                             original_channels=1)
-        final_result = normalizer.process(step1_result, 
+        # 以管線串接處理 - 中間結果維持 float32，只在出口轉回 int16
+        pipeline = AudioPipeline([noise_processor, normalizer])
+        final_result = pipeline.process(audio_bytes, 
                                         original_sample_rate=sample_rate, 
                                         original_channels=1)
         
@@ -345,7 +626,7 @@ class TestPreprocessorIntegration:
         assert len(final_result) > 0
         
         final_array, _, _ = bytes_to_numpy(final_result, sample_rate, 1)
-        assert len(final_array) > 0
+        assert len(final_array) == len(noisy_signal_int16)
 
 
 if __name__ == "__main__":
@@ -353,27 +634,29 @@ if __name__ == "__main__":
     print("開始測試前處理器...")
     
     try:
+        tones = make_tone_cache()
+        
         # 測試降噪處理器
+        noise_processor = NoiseReductionProcessor(NOISE_CONFIG)
         test_noise = TestNoiseReductionProcessor()
-        test_noise.setup_method()
-        test_noise.test_initialization_success()
-        test_noise.test_process_with_noise_reduction()
-        test_noise.test_process_with_parameters()
-        test_noise.test_process_without_parameters()
+        test_noise.test_initialization_success(noise_processor)
+        test_noise.test_process_with_noise_reduction(noise_processor, tones)
+        test_noise.test_process_with_parameters(noise_processor, tones)
+        test_noise.test_process_without_parameters(noise_processor, tones)
         print("✅ NoiseReductionProcessor 基本測試通過")
         
         # 測試標準化處理器
+        normalizer = AudioNormalizer(NORMALIZER_CONFIG)
         test_norm = TestAudioNormalizer()
-        test_norm.setup_method()
-        test_norm.test_initialization_success()
-        test_norm.test_process_normalization()
-        test_norm.test_process_no_conversion_needed()
-        test_norm.test_process_without_original_params()
+        test_norm.test_initialization_success(normalizer)
+        test_norm.test_process_normalization(normalizer, tones)
+        test_norm.test_process_no_conversion_needed(NORMALIZER_CONFIG, tones)
+        test_norm.test_process_without_original_params(normalizer, tones)
         print("✅ AudioNormalizer 基本測試通過")
         
         # 測試整合
         test_integration = TestPreprocessorIntegration()
-        test_integration.test_noise_reduction_and_normalization_pipeline()
+        test_integration.test_noise_reduction_and_normalization_pipeline(tones)
         print("✅ 前處理器整合測試通過")
         
         print("🎉 所有前處理器測試完成！")
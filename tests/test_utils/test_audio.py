@@ -0,0 +1,295 @@
+"""測試音訊處理工具函數"""
+
+import pytest
+import numpy as np
+import src.utils.audio as audio_module
+from src.utils.audio import bytes_to_numpy, calculate_rms, convert_to_mono, int16_to_float32, float32_to_int16
+from src.utils.exceptions import InvalidAudioFormatError
+
+
+class TestBytesToNumpy:
+    """測試 bytes_to_numpy 函數"""
+    
+    def test_memoryview_shares_memory(self):
+        """測試 memoryview 輸入不複製資料，長度以位元組計算"""
+        pcm = np.arange(6, dtype=np.int16)
+        
+        audio_array, _, _ = bytes_to_numpy(memoryview(pcm), 16000, 2)
+        
+        assert audio_array.shape == (3, 2)
+        assert np.shares_memory(audio_array, pcm)
+        np.testing.assert_array_equal(bytes_to_numpy(bytearray(pcm.tobytes()), 16000, 2)[0], audio_array)
+    
+    def test_rejects_partial_sample(self):
+        """測試長度不是樣本大小倍數時拋出例外"""
+        with pytest.raises(InvalidAudioFormatError):
+            bytes_to_numpy(memoryview(b"\x00\x01\x02"))
+
+
+class TestCalculateRms:
+    """測試 calculate_rms 函數"""
+    
+    def test_int16_signal(self):
+        """測試 int16 信號的 RMS 與 numpy 計算一致"""
+        signal = np.array([[1000, -1000], [3000, -3000]], dtype=np.int16)
+        
+        expected = np.sqrt(np.mean(signal.astype(np.float64) ** 2))
+        
+        assert calculate_rms(signal) == pytest.approx(expected)
+    
+    def test_empty_signal(self):
+        """測試空信號返回 0"""
+        assert calculate_rms(np.zeros(0, dtype=np.int16)) == 0.0
+
+
+class TestPcmConversion:
+    """測試 int16 與 float32 互轉"""
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_round_trip_with_buffers(self, monkeypatch, use_numba):
+        """測試使用預先配置的陣列時結果與一般轉換相同"""
+        monkeypatch.setattr(audio_module, 'HAS_NUMBA', audio_module.HAS_NUMBA and use_numba)
+        signal = np.array([[-32768, 32767], [1234, -4321]], dtype=np.int16)
+        
+        f32 = np.empty(signal.shape, dtype=np.float32)
+        result = int16_to_float32(signal, out=f32)
+        assert result is f32
+        np.testing.assert_array_equal(f32, int16_to_float32(signal))
+        
+        i16 = np.empty(signal.shape, dtype=np.int16)
+        work = np.empty(signal.shape, dtype=np.float32)
+        result = float32_to_int16(f32, out=i16, work=work)
+        assert result is i16
+        np.testing.assert_array_equal(i16, signal)
+    
+    def test_float32_to_int16_saturates(self):
+        """測試超出範圍的值被截斷在 int16 範圍內"""
+        signal = np.array([-2.0, -1.0, 0.5, 1.0, 2.0], dtype=np.float32)
+        
+        np.testing.assert_array_equal(
+            float32_to_int16(signal),
+            np.array([-32768, -32768, 16384, 32767, 32767], dtype=np.int16)
+        )
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_float32_to_int16_rounds(self, monkeypatch, use_numba):
+        """測試轉換時四捨五入而不是向零截斷"""
+        monkeypatch.setattr(audio_module, 'HAS_NUMBA', audio_module.HAS_NUMBA and use_numba)
+        signal = np.array([0.7, -0.7, 1.4, -1.4], dtype=np.float32) / np.float32(32768.0)
+        
+        np.testing.assert_array_equal(
+            float32_to_int16(signal),
+            np.array([1, -1, 1, -1], dtype=np.int16)
+        )
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_float32_to_int16_scale(self, monkeypatch, use_numba):
+        """測試依指定比例縮放、四捨五入並飽和截斷"""
+        monkeypatch.setattr(audio_module, 'HAS_NUMBA', audio_module.HAS_NUMBA and use_numba)
+        signal = np.array([-1.5, -0.5, 0.00004, 0.5, 1.5], dtype=np.float32)
+        out = np.empty(signal.shape, dtype=np.int16)
+        
+        result = float32_to_int16(signal, out=out, scale=32767)
+        
+        assert result is out
+        np.testing.assert_array_equal(out, np.array([-32768, -16384, 1, 16384, 32767], dtype=np.int16))
+        np.testing.assert_array_equal(float32_to_int16(signal, scale=16000),
+                                      np.array([-24000, -8000, 1, 8000, 24000], dtype=np.int16))
+
+
+class TestConvertToMono:
+    """測試 convert_to_mono 函數"""
+    
+    @pytest.mark.parametrize("channels", [2, 6])
+    def test_int16_matches_float_mean(self, channels):
+        """測試 int16 整數域降混與浮點平均相差不超過 1 LSB"""
+        rng = np.random.default_rng(0)
+        signal = rng.integers(-32768, 32768, size=(1000, channels)).astype(np.int16)
+        
+        mono = convert_to_mono(signal)
+        expected = np.mean(signal.astype(np.float64), axis=1)
+        
+        assert mono.dtype == np.int16
+        assert mono.shape == (1000,)
+        assert np.max(np.abs(mono - expected)) < 1.0
+    
+    def test_int16_numba_matches_numpy(self, monkeypatch):
+        """測試 numba kernel 與 numpy 整數路徑結果相同"""
+        if not audio_module.HAS_NUMBA:
+            pytest.skip("numba 未安裝")
+        
+        rng = np.random.default_rng(0)
+        signal = rng.integers(-32768, 32768, size=(1000, 2)).astype(np.int16)
+        
+        fused = convert_to_mono(signal)
+        monkeypatch.setattr(audio_module, 'HAS_NUMBA', False)
+        
+        np.testing.assert_array_equal(fused, convert_to_mono(signal))
+
+
+class TestResampleFallback:
+    """測試 scipy 未安裝時的線性插值重採樣"""
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_linear_matches_np_interp(self, monkeypatch, use_numba):
+        """測試線性插值結果與 np.interp 一致"""
+        monkeypatch.setattr(audio_module, 'resample_poly', None)
+        monkeypatch.setattr(audio_module, 'HAS_NUMBA', audio_module.HAS_NUMBA and use_numba)
+        rng = np.random.default_rng(0)
+        signal = rng.standard_normal((4410, 2)).astype(np.float32)
+        
+        result = audio_module._resample_audio(signal, 44100, 16000)
+        
+        old_indices = np.linspace(0, 4409, 4410)
+        new_indices = np.linspace(0, 4409, 1600)
+        assert result.shape == (1600, 2)
+        assert result.dtype == np.float32
+        for channel in range(2):
+            expected = np.interp(new_indices, old_indices, signal[:, channel])
+            np.testing.assert_allclose(result[:, channel], expected, atol=1e-5)
+
+
+class TestResample:
+    """測試 resample 的後端選擇與輸出格式"""
+    
+    def test_same_rate_returns_input(self):
+        """測試採樣率相同時直接返回原陣列"""
+        signal = np.zeros(160, dtype=np.float32)
+        assert audio_module.resample(signal, 16000, 16000) is signal
+    
+    def test_dispatches_to_soxr(self, monkeypatch):
+        """測試安裝 soxr 時交由 soxr 處理並傳入品質等級"""
+        calls = []
+        
+        class FakeSoxr:
+            @staticmethod
+            def resample(audio_array, original_rate, target_rate, quality):
+                calls.append((audio_array, original_rate, target_rate, quality))
+                return audio_array[::2]
+        
+        monkeypatch.setattr(audio_module, 'soxr', FakeSoxr)
+        signal = np.zeros(320, dtype=np.float32)
+        
+        result = audio_module.resample(signal, 32000, 16000, quality='VHQ')
+        
+        assert len(calls) == 1
+        assert calls[0][0] is signal
+        assert calls[0][1:] == (32000, 16000, 'VHQ')
+        assert result.shape == (160,)
+    
+    @pytest.mark.parametrize("backend", ["soxr", "scipy"])
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int16])
+    def test_preserves_dtype_and_channels(self, monkeypatch, backend, dtype):
+        """測試一維與 (frames, channels) 輸入都維持 dtype 與聲道數"""
+        if backend == "soxr":
+            if audio_module.soxr is None:
+                pytest.skip("soxr 未安裝")
+        else:
+            if audio_module.resample_poly is None:
+                pytest.skip("scipy 未安裝")
+            monkeypatch.setattr(audio_module, 'soxr', None)
+        
+        rng = np.random.default_rng(0)
+        stereo = (rng.standard_normal((4410, 2)) * 1000).astype(dtype)
+        
+        result = audio_module.resample(stereo, 44100, 16000)
+        assert result.dtype == dtype
+        assert result.shape == (1600, 2)
+        
+        result = audio_module.resample(np.ascontiguousarray(stereo[:, 0]), 44100, 16000)
+        assert result.dtype == dtype
+        assert result.shape == (1600,)
+    
+    def test_stereo_channels_resampled_independently(self):
+        """測試多聲道輸入與逐聲道重採樣結果相同"""
+        rng = np.random.default_rng(1)
+        stereo = rng.standard_normal((8000, 2)).astype(np.float32)
+        
+        result = audio_module.resample(stereo, 8000, 16000)
+        
+        for channel in range(2):
+            mono = audio_module.resample(np.ascontiguousarray(stereo[:, channel]), 8000, 16000)
+            np.testing.assert_allclose(result[:, channel], mono, atol=1e-5)
+    
+    def test_int16_full_scale_saturates(self, monkeypatch):
+        """測試滿刻度 int16 方波經多相位濾波後飽和截斷，不會溢位繞回"""
+        if audio_module.resample_poly is None:
+            pytest.skip("scipy 未安裝")
+        monkeypatch.setattr(audio_module, 'soxr', None)
+        
+        square = np.where(np.arange(44100) % 100 < 50, 32767, -32768).astype(np.int16)
+        
+        result = audio_module.resample(square, 44100, 16000)
+        
+        # 期望值：浮點重採樣後四捨五入並截斷
+        reference = audio_module.resample(square.astype(np.float64), 44100, 16000)
+        expected = np.clip(np.rint(reference), -32768, 32767).astype(np.int16)
+        assert result.dtype == np.int16
+        np.testing.assert_array_equal(result, expected)
+        
+        # 濾波確實過衝超出 int16 範圍，且截斷後沒有正負號翻轉
+        assert np.abs(reference).max() > 32767
+        loud = np.abs(reference) > 16384
+        assert np.all(np.sign(result[loud]) == np.sign(reference[loud]))
+
+
+class TestPolyphaseResample:
+    """測試快取濾波器的多相位重採樣"""
+    
+    @pytest.mark.parametrize("original_rate, target_rate", [(44100, 16000), (8000, 16000), (48000, 16000)])
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_matches_resample_poly(self, original_rate, target_rate, dtype):
+        """測試與 scipy.signal.resample_poly 預設濾波器的結果完全相同"""
+        if audio_module.resample_poly is None:
+            pytest.skip("scipy 未安裝")
+        from math import gcd
+        from scipy.signal import resample_poly
+        
+        rng = np.random.default_rng(2)
+        signal = rng.standard_normal((original_rate // 10, 2)).astype(dtype)
+        g = gcd(original_rate, target_rate)
+        
+        result = audio_module._resample_audio(signal, original_rate, target_rate)
+        expected = resample_poly(signal, target_rate // g, original_rate // g, axis=0)
+        
+        assert result.dtype == dtype
+        np.testing.assert_array_equal(result, expected.astype(dtype))
+    
+    def test_filter_cached_and_read_only(self):
+        """測試同一組參數只設計一次濾波器，且係數不可修改"""
+        if audio_module.resample_poly is None:
+            pytest.skip("scipy 未安裝")
+        
+        taps = audio_module._polyphase_filter(160, 441, '<f4')
+        assert taps is audio_module._polyphase_filter(160, 441, '<f4')
+        assert not taps.flags.writeable
+
+
+class TestNormalizeAudioArray:
+    """測試 normalize_audio_array 的聲道與採樣率轉換"""
+    
+    def test_stereo_to_mono_with_resample(self):
+        """測試立體聲降混後再重採樣，結果與先降混再重採樣相同"""
+        rng = np.random.default_rng(3)
+        stereo = rng.standard_normal((4410, 2)).astype(np.float32)
+        
+        result = audio_module.normalize_audio_array(stereo, 44100, 2, 16000, 1)
+        
+        assert result.shape == (1600,)
+        assert result.dtype == np.float32
+        expected = audio_module.resample(convert_to_mono(stereo), 44100, 16000)
+        np.testing.assert_allclose(result, expected, atol=1e-6)
+    
+    def test_mono_to_stereo_with_resample(self):
+        """測試單聲道重採樣後再升混，每個聲道都是相同且連續的資料"""
+        rng = np.random.default_rng(4)
+        mono = rng.standard_normal(800).astype(np.float32)
+        
+        result = audio_module.normalize_audio_array(mono, 8000, 1, 16000, 2)
+        
+        assert result.shape == (1600, 2)
+        assert result.dtype == np.float32
+        assert result.flags.c_contiguous
+        expected = audio_module.resample(mono, 8000, 16000)
+        np.testing.assert_allclose(result[:, 0], expected, atol=1e-6)
+        np.testing.assert_array_equal(result[:, 0], result[:, 1])